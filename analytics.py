@@ -0,0 +1,225 @@
+"""Streaming survival and economy statistics over simulated games.
+
+Every game is folded into fixed-size aggregates as soon as it finishes:
+quantile sketches, histograms and Kaplan-Meier tables. Workers build
+partial aggregates and the parent merges them, so memory doesn't grow with
+the number of games:
+
+    python analytics.py --games 100000 --builds luck,damage,health,mixed
+
+With --trace every turn is also written to a columnar trace file per batch
+(see tracestore.py) for offline digging.
+"""
+import argparse
+import contextlib
+import math
+import multiprocessing
+import os
+import time
+from collections import Counter
+
+import sim
+import tracestore
+
+class QuantileSketch:
+    """Mergeable quantile sketch with a bounded relative error.
+
+    Values are counted in logarithmic buckets (as in DDSketch), so a sketch
+    covering 1 to 10^9 at 1% accuracy never holds more than ~1000 buckets.
+    Values below `min_value`, including zero and negatives, share one bucket.
+    """
+
+    def __init__(self, accuracy=0.01, min_value=1e-3):
+        self.accuracy = accuracy
+        self.gamma = (1 + accuracy) / (1 - accuracy)
+        self.log_gamma = math.log(self.gamma)
+        self.min_value = min_value
+        self.buckets = Counter()
+        self.low = 0
+        self.count = 0
+        self.min = math.inf
+        self.max = -math.inf
+
+    def add(self, value, count=1):
+        self.count += count
+        self.min = min(self.min, value)
+        self.max = max(self.max, value)
+        if value < self.min_value:
+            self.low += count
+        else:
+            self.buckets[math.ceil(math.log(value) / self.log_gamma)] += count
+
+    def merge(self, other):
+        if other.gamma != self.gamma:
+            raise ValueError("can only merge sketches with the same accuracy")
+        self.buckets.update(other.buckets)
+        self.low += other.low
+        self.count += other.count
+        self.min = min(self.min, other.min)
+        self.max = max(self.max, other.max)
+        return self
+
+    def quantile(self, q):
+        if not self.count:
+            return math.nan
+        rank = q * (self.count - 1)
+        if rank < self.low:
+            return max(self.min, 0.0) if self.min < self.min_value else self.min
+        seen = self.low
+        for key in sorted(self.buckets):
+            seen += self.buckets[key]
+            if seen > rank:
+                estimate = 2 * self.gamma ** key / (self.gamma + 1)
+                return min(max(estimate, self.min), self.max)
+        return self.max
+
+class SurvivalTable:
+    """Deaths and censored games per turn, for Kaplan-Meier survival curves.
+
+    Games that run past `horizon` count as still alive at `horizon`
+    (censored there, whatever happened later) so the table stays a fixed size.
+    """
+
+    def __init__(self, horizon=500):
+        self.horizon = horizon
+        self.deaths = [0] * (horizon + 1)
+        self.censored = [0] * (horizon + 1)
+
+    def add(self, turns, died):
+        if turns > self.horizon:
+            self.censored[self.horizon] += 1
+        elif died:
+            self.deaths[turns] += 1
+        else:
+            self.censored[turns] += 1
+
+    def merge(self, other):
+        self.deaths = [a + b for a, b in zip(self.deaths, other.deaths)]
+        self.censored = [a + b for a, b in zip(self.censored, other.censored)]
+        return self
+
+    def kaplan_meier(self):
+        """[(turn, chance of still being alive after that turn)] at each death."""
+        at_risk = sum(self.deaths) + sum(self.censored)
+        survival = 1.0
+        curve = []
+        for turn, (died, left) in enumerate(zip(self.deaths, self.censored)):
+            if died:
+                survival *= 1 - died / at_risk
+                curve.append((turn, survival))
+            at_risk -= died + left
+        return curve
+
+    def survival_at(self, turn):
+        alive = 1.0
+        for t, s in self.kaplan_meier():
+            if t > turn:
+                break
+            alive = s
+        return alive
+
+class BuildStats:
+    """Everything we keep about the games played with one build."""
+
+    def __init__(self, build, horizon=500):
+        self.build = build
+        self.games = 0
+        self.outcomes = Counter()
+        self.turns = QuantileSketch()
+        self.money_at_death = QuantileSketch()
+        self.escape_turn = QuantileSketch()
+        self.causes = Counter()
+        self.fish = Counter()
+        self.survival = SurvivalTable(horizon)
+
+    def add(self, result: sim.GameResult):
+        self.games += 1
+        self.outcomes[result.outcome] += 1
+        self.turns.add(result.turns)
+        self.fish.update(result.fish)
+        died = result.outcome == "dead"
+        self.survival.add(result.turns, died)
+        if died:
+            self.money_at_death.add(result.money)
+            self.causes[result.cause_of_death or "Unknown"] += 1
+        elif result.outcome == "escaped":
+            self.escape_turn.add(result.turns)
+
+    def merge(self, other):
+        self.games += other.games
+        self.outcomes.update(other.outcomes)
+        self.turns.merge(other.turns)
+        self.money_at_death.merge(other.money_at_death)
+        self.escape_turn.merge(other.escape_turn)
+        self.causes.update(other.causes)
+        self.fish.update(other.fish)
+        self.survival.merge(other.survival)
+        return self
+
+    def report(self):
+        n = self.games or 1
+        lines = [
+            f"== {self.build} ({self.games:,} games) ==",
+            f"  escaped {self.outcomes['escaped'] / n:.2%}, died {self.outcomes['dead'] / n:.2%}, "
+            f"timed out {self.outcomes['timeout'] / n:.2%}",
+            "  turns survived  p50 {:.0f}  p90 {:.0f}  p99 {:.0f}  max {:.0f}".format(
+                *(self.turns.quantile(q) for q in (0.5, 0.9, 0.99)), self.turns.max),
+            "  money at death  p50 {:.2f}  p90 {:.2f}".format(
+                *(self.money_at_death.quantile(q) for q in (0.5, 0.9))),
+        ]
+        if self.escape_turn.count:
+            lines.append("  escape turn     p50 {:.0f}  p90 {:.0f}".format(
+                *(self.escape_turn.quantile(q) for q in (0.5, 0.9))))
+        deaths = sum(self.causes.values()) or 1
+        lines.append("  killed by       " + ", ".join(
+            f"{cause} {count / deaths:.1%}" for cause, count in self.causes.most_common()))
+        lines.append("  fish per game   " + ", ".join(
+            f"{cat} {self.fish[cat] / n:.2f}" for cat in ("common", "rare", "epic", "legendary")))
+        lines.append("  still alive at  " + ", ".join(
+            f"t{t} {self.survival.survival_at(t):.1%}" for t in (10, 25, 50, 100, 200)))
+        return "\n".join(lines)
+
+def simulate(job):
+    build, first_seed, count, max_turns, trace_dir = job
+    stats = BuildStats(build)
+    with contextlib.ExitStack() as stack:
+        trace = None
+        if trace_dir:
+            path = os.path.join(trace_dir, f"{build}-{first_seed}.zpt")
+            trace = stack.enter_context(tracestore.TraceWriter(path, sim.TRACE_FIELDS))
+        for seed in range(first_seed, first_seed + count):
+            stats.add(sim.run_game(seed, build, max_turns, trace=trace))
+    return stats
+
+def run(builds, games, jobs=None, first_seed=0, max_turns=1000, batch=500, trace_dir=None):
+    """Simulates `games` games per build across a process pool, returns {build: BuildStats}."""
+    if trace_dir:
+        os.makedirs(trace_dir, exist_ok=True)
+    # Handed out lazily so memory stays flat however many batches there are
+    work = ((build, s, min(batch, first_seed + games - s), max_turns, trace_dir)
+            for build in builds for s in range(first_seed, first_seed + games, batch))
+    totals = {build: BuildStats(build) for build in builds}
+    with multiprocessing.Pool(jobs) as pool:
+        for partial in pool.imap_unordered(simulate, work):
+            totals[partial.build].merge(partial)
+    return totals
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10000, help="games per build")
+    parser.add_argument("--builds", default=",".join(sim.BUILDS))
+    parser.add_argument("--max-turns", type=int, default=1000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--trace", metavar="DIR", help="write per-turn traces here")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    totals = run(args.builds.split(","), args.games, args.jobs, args.seed, args.max_turns,
+                 trace_dir=args.trace)
+    for stats in totals.values():
+        print(stats.report())
+    print(f"done in {time.perf_counter() - start:.1f}s")
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,182 @@
+"""Checks that auto-battle fights come out like fights played round by round.
+
+For every enemy, tactic and a couple of player builds, plays fights through
+run_combat's real menus three ways: choosing each round's move by hand as
+the tactic would, picking Auto-battle straight away, and playing a few
+rounds by hand before switching to Auto-battle, so it picks up a hurt zombie
+and maybe a grapple mid-fight. Every sample is chi-square tested against the
+exact fight_odds() distribution, hand and auto against each other, and money
+won against the hand-played fights with a z-test. test_auto_battle.py runs
+the same checks on a smaller fixed sample; this runs them at full size:
+
+    python combat_check.py --fights 4000
+"""
+import argparse
+import math
+import random
+import sys
+from collections import Counter
+
+import main
+from sim import headless
+
+# Rounds played by hand before the late switch to Auto-battle
+SWITCH_ROUND = 2
+
+# Player setups to fight with: label and Player fields to set
+SETUPS = {
+    "fresh": {},
+    "geared": {"base_damage": 3, "weapon_mod": 2, "dodge": 20, "base_luck": 6, "max_health": 14, "health": 14},
+}
+
+class TacticInput(main.AutomatedInput):
+    """Answers the combat menus for one tactic. `auto` is how many rounds to
+    play by hand before picking Auto-battle, None to play them all by hand."""
+
+    def __init__(self, player, enemy, tactic, auto):
+        self.player = player
+        self.enemy = enemy
+        self.tactic = tactic
+        self.auto = auto
+        self.rounds = 0
+
+    def read_line(self, prompt="", options=None):
+        if options.get("6") == "Auto-battle...":
+            self.rounds += 1
+            if self.auto is not None and self.rounds > self.auto:
+                return "6"
+        elif self.auto is not None:
+            return str(list(main.TACTICS).index(self.tactic) + 1)
+        can_flee = "5" in options and main.flee_odds(self.enemy, self.player.effective.flee_bonus) > 0
+        return main.tactic_move(self.tactic, self.enemy, self.player.health, can_flee)
+
+def make_player(setup):
+    player = main.Player()
+    for name, value in SETUPS[setup].items():
+        setattr(player, name, value)
+    return player
+
+def fight(enemy, setup, tactic, auto, seed):
+    """One fight, returns ((result, health left), money won)."""
+    random.seed(seed)
+    player = make_player(setup)
+    previous = main.set_input(TacticInput(player, enemy, tactic, auto))
+    try:
+        with headless():
+            result = main.run_combat(player, enemy)
+    finally:
+        main.set_input(previous)
+    return (result, max(player.health, 0)), player.money - 10
+
+def exact(enemy, setup, tactic):
+    """fight_odds() for a fresh fight, over every HP the zombie could start with."""
+    player = make_player(setup)
+    stats, health = player.effective, player.health
+    odds = Counter()
+    spread = enemy.hp_max - enemy.hp_min + 1
+    for zombie_hp in range(enemy.hp_min, enemy.hp_max + 1):
+        for key, p in main.fight_odds(enemy, zombie_hp, health, False, stats.damage,
+                                      stats.dodge, stats.flee_bonus, tactic).items():
+            odds[key] += p / spread
+    return odds
+
+def chi2_p(statistic, dof):
+    """Upper tail of the chi-square distribution (Wilson-Hilferty approximation)."""
+    if dof <= 0:
+        return 1.0
+    z = ((statistic / dof) ** (1 / 3) - (1 - 2 / (9 * dof))) / math.sqrt(2 / (9 * dof))
+    return 0.5 * math.erfc(z / math.sqrt(2))
+
+def fit_p(counts, odds):
+    """Goodness of fit of observed counts to exact odds, sparse cells pooled."""
+    n = sum(counts.values())
+    statistic, cells, pooled_seen, pooled_expected = 0.0, 0, 0, 0.0
+    for key in set(odds) | set(counts):
+        expected = odds.get(key, 0.0) * n
+        if expected < 5:
+            pooled_seen += counts[key]
+            pooled_expected += expected
+            continue
+        statistic += (counts[key] - expected) ** 2 / expected
+        cells += 1
+    if pooled_expected > 0:
+        statistic += (pooled_seen - pooled_expected) ** 2 / pooled_expected
+        cells += 1
+    elif pooled_seen:
+        return 0.0  # outcomes that can't happen happened
+    return chi2_p(statistic, cells - 1)
+
+def same_p(a, b):
+    """Chi-square test that two samples of outcomes come from one distribution."""
+    na, nb = sum(a.values()), sum(b.values())
+    rows = [[a[key], b[key]] for key in set(a) | set(b)]
+    big = [row for row in rows if sum(row) * min(na, nb) / (na + nb) >= 5]
+    small = [sum(col) for col in zip(*[row for row in rows if row not in big])]
+    if small and sum(small):
+        big.append(small)
+    statistic = 0.0
+    for seen_a, seen_b in big:
+        total = seen_a + seen_b
+        for seen, n in ((seen_a, na), (seen_b, nb)):
+            expected = total * n / (na + nb)
+            statistic += (seen - expected) ** 2 / expected
+    return chi2_p(statistic, len(big) - 1)
+
+def mean_p(a, b):
+    """Two-sided z-test on the difference of two sample means."""
+    def moments(xs):
+        m = sum(xs) / len(xs)
+        return m, sum((x - m) ** 2 for x in xs) / max(1, len(xs) - 1) / len(xs)
+    (ma, va), (mb, vb) = moments(a), moments(b)
+    if va + vb == 0:
+        return 1.0 if ma == mb else 0.0
+    return math.erfc(abs(ma - mb) / math.sqrt(2 * (va + vb)))
+
+# p-values check_case() returns, in order
+CHECKS = ("hand~exact", "auto~exact", "late~exact", "hand=auto", "money", "late $")
+
+def check_case(enemy, setup, tactic, fights, seed=0):
+    """p-values of CHECKS for one enemy, setup and tactic over `fights` fights per path."""
+    seeds = range(seed, seed + fights)
+    by_hand = [fight(enemy, setup, tactic, None, s) for s in seeds]
+    auto = [fight(enemy, setup, tactic, 0, ~s) for s in seeds]
+    late = [fight(enemy, setup, tactic, SWITCH_ROUND, s + fights) for s in seeds]
+    hand_counts = Counter(outcome for outcome, _ in by_hand)
+    auto_counts = Counter(outcome for outcome, _ in auto)
+    late_counts = Counter(outcome for outcome, _ in late)
+    odds = exact(enemy, setup, tactic)
+    hand_money = [money for _, money in by_hand]
+    return (fit_p(hand_counts, odds), fit_p(auto_counts, odds), fit_p(late_counts, odds),
+            same_p(hand_counts, auto_counts),
+            mean_p(hand_money, [money for _, money in auto]),
+            mean_p(hand_money, [money for _, money in late]))
+
+def cases():
+    return [(enemy, setup, tactic) for enemy in main.ENEMIES
+            for setup in SETUPS for tactic in main.TACTICS]
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--fights", type=int, default=4000, help="fights per case and path")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--alpha", type=float, default=0.01, help="family-wise error rate")
+    args = parser.parse_args()
+
+    todo = cases()
+    tests = len(CHECKS) * len(todo)
+    cutoff = args.alpha / tests  # Bonferroni
+    failed = 0
+    print(f"{'enemy':<10} {'setup':<7} {'tactic':<8} "
+          + " ".join(f"{name:>10}" for name in CHECKS[:4])
+          + "".join(f" {name:>8}" for name in CHECKS[4:]))
+    for enemy, setup, tactic in todo:
+        ps = check_case(enemy, setup, tactic, args.fights, args.seed)
+        bad = sum(p < cutoff for p in ps)
+        failed += bad
+        print(f"{enemy.name:<10} {setup:<7} {tactic:<8} " + " ".join(f"{p:10.3f}" for p in ps[:4])
+              + "".join(f" {p:8.3f}" for p in ps[4:]) + ("  FAIL" if bad else ""))
+    print(f"{tests} tests, {failed} below p = {cutoff:.1e}")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main_cli()
@@ -0,0 +1,221 @@
+"""Headless fuzzer for Zombie Pro Fisher.
+
+Plays whole games with random and boundary inputs fed through read_line(),
+checking player invariants before every input. Crashes are shrunk to a
+minimal input list and saved as JSON so they can be replayed:
+
+    python fuzz.py --games 20000 --jobs 8
+    python fuzz.py --replay fuzz_crashes/seed-123.json
+"""
+import argparse
+import contextlib
+import json
+import multiprocessing
+import os
+import random
+import time
+import traceback
+
+import main
+from sim import headless
+
+CRASH_DIR = "fuzz_crashes"
+
+# Inputs that have broken menus before: empty lines, out of range indexes,
+# letters where numbers are expected and numbers that don't fit an int.
+BOUNDARY_INPUTS = [
+    "", " ", "0", "-1", "6", "7", "8", "99", "a", "b", "s", "x", "1.5",
+    "\t", "１", "9" * 30, "x50", "until hungry",
+]
+
+ALL_FISH = {fish for pool in main.FISH_POOLS.values() for fish in pool}
+
+class InvariantError(AssertionError):
+    pass
+
+def check_invariants(player, new_turn):
+    if player.health > player.max_health:
+        raise InvariantError(f"health {player.health} > max_health {player.max_health}")
+    if player.money < 0:
+        raise InvariantError(f"money went negative: {player.money}")
+    if sum(player.fish_counts.values()) != len(player.fish_list):
+        raise InvariantError(f"fish_counts {player.fish_counts} don't match {len(player.fish_list)} fish")
+    if not set(player.fish_list) <= ALL_FISH:
+        raise InvariantError(f"unknown fish in bag: {set(player.fish_list) - ALL_FISH}")
+    if len(set(player.unique_items)) != len(player.unique_items):
+        raise InvariantError(f"unique item bought twice: {player.unique_items}")
+    if min(player.wood, player.stone, player.machineparts) < 0:
+        raise InvariantError("negative resources")
+    # Hunger may dip below zero mid-turn; update_stats() settles it at turn start
+    if new_turn and player.hunger < 0:
+        raise InvariantError(f"hunger {player.hunger} at start of turn")
+
+class FuzzInput(main.AutomatedInput):
+    """Random inputs, or a recorded script, with invariant checks on every read."""
+
+    def __init__(self, player, rng, max_steps, script=None, echo=False):
+        self.player = player
+        self.rng = rng
+        self.max_steps = max_steps
+        self.script = script
+        self.echo = echo
+        self.inputs = []
+        self._last_turn = None
+
+    def _next_input(self):
+        if self.script is not None:
+            if len(self.inputs) >= len(self.script):
+                raise EOFError
+            return self.script[len(self.inputs)]
+        if len(self.inputs) >= self.max_steps:
+            raise EOFError
+        if self.rng.random() < 0.85:
+            return str(self.rng.randint(0, 7))
+        return self.rng.choice(BOUNDARY_INPUTS)
+
+    def read_line(self, prompt="", options=None):
+        check_invariants(self.player, self.player.turns != self._last_turn)
+        self._last_turn = self.player.turns
+        line = self._next_input()
+        self.inputs.append(line)
+        if self.echo:
+            print(f"{prompt}{line}")
+        return line
+
+def quick_best_action(state, rollouts=2000, depth=25, rng=random):
+    """Stand-in for main.best_action: any legal move, no lookahead."""
+    return rng.choice(main.state_actions(state)), 0.0
+
+def quick_odds_table(odds, enemy, *key):
+    """Stand-in for main.odds_table: every way a fight can end, equally likely."""
+    health = key[1] if odds is main.fight_odds else key[-1]
+    outcomes = [("won", health), ("won", max(1, health - enemy.dmg_max)),
+                ("escaped", health), ("dead", 0)]
+    return outcomes, [1, 2, 3, 4]
+
+@contextlib.contextmanager
+def planner_settings(seed):
+    """Exact fight odds and the lookahead behind hints and shop estimates cost
+    more than the rest of a game, so only one game in ten runs them, with
+    hints cut to 2 rollouts. main's settings are put back afterwards."""
+    saved = main.HINT_ROLLOUTS, main.SHOP_ESTIMATES, main.best_action, main.odds_table
+    planner = seed % 10 == 0
+    main.HINT_ROLLOUTS = 2  # hints are exercised, not judged
+    main.SHOP_ESTIMATES = planner
+    if not planner:
+        main.best_action = quick_best_action
+        main.odds_table = quick_odds_table
+    try:
+        yield
+    finally:
+        main.HINT_ROLLOUTS, main.SHOP_ESTIMATES, main.best_action, main.odds_table = saved
+
+def run_game(seed, max_steps=2000, script=None):
+    """Plays one game. Returns (turns played, crash report or None)."""
+    random.seed(seed)
+    player = main.Player()
+    source = FuzzInput(player, random.Random(~seed), max_steps, script)
+    previous = main.set_input(source)
+    try:
+        with headless(), planner_settings(seed):
+            main.character_creation(player)
+            main.play(player)
+    except EOFError:
+        pass
+    except Exception as exc:
+        tb = traceback.extract_tb(exc.__traceback__)[-1]
+        return player.turns, {
+            "seed": seed,
+            "error": f"{type(exc).__name__}: {exc}",
+            "where": f"{os.path.basename(tb.filename)}:{tb.lineno}",
+            "inputs": source.inputs,
+        }
+    finally:
+        main.set_input(previous)
+    return player.turns, None
+
+def same_crash(seed, inputs, crash):
+    _, again = run_game(seed, script=inputs)
+    return again is not None and again["where"] == crash["where"] and \
+        again["error"].split(":")[0] == crash["error"].split(":")[0]
+
+def minimize(crash):
+    """Delta-debugs the input list down to a smaller one that crashes the same way."""
+    seed, inputs = crash["seed"], crash["inputs"]
+    chunk = len(inputs) // 2
+    while chunk >= 1:
+        i = 0
+        while i < len(inputs):
+            candidate = inputs[:i] + inputs[i + chunk:]
+            if candidate and same_crash(seed, candidate, crash):
+                inputs = candidate
+            else:
+                i += chunk
+        chunk //= 2
+    _, final = run_game(seed, script=inputs)
+    return final
+
+def save_crash(crash):
+    os.makedirs(CRASH_DIR, exist_ok=True)
+    path = os.path.join(CRASH_DIR, f"seed-{crash['seed']}.json")
+    with open(path, "w") as f:
+        json.dump(crash, f, indent=2)
+    return path
+
+def fuzz_batch(args):
+    first_seed, count, max_steps = args
+    turns = 0
+    crashes = []
+    for seed in range(first_seed, first_seed + count):
+        played, crash = run_game(seed, max_steps)
+        turns += played
+        if crash:
+            crashes.append(minimize(crash) or crash)
+    return turns, crashes
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--games", type=int, default=10000)
+    parser.add_argument("--steps", type=int, default=2000, help="max inputs per game")
+    parser.add_argument("--seed", type=int, default=0, help="first seed")
+    parser.add_argument("--jobs", type=int, default=os.cpu_count())
+    parser.add_argument("--replay", help="crash file to replay with output shown")
+    args = parser.parse_args()
+
+    if args.replay:
+        with open(args.replay) as f:
+            crash = json.load(f)
+        # Same checks as the run that found it, so invariant breaks show up too
+        random.seed(crash["seed"])
+        player = main.Player()
+        main.set_input(FuzzInput(player, None, 0, crash["inputs"], echo=True))
+        try:
+            with planner_settings(crash["seed"]):
+                main.character_creation(player)
+                main.play(player)
+        except EOFError:
+            print("\nReplay finished without crashing.")
+        return
+
+    batch = 50
+    jobs = [(s, min(batch, args.seed + args.games - s), args.steps)
+            for s in range(args.seed, args.seed + args.games, batch)]
+    start = time.perf_counter()
+    total_turns = 0
+    seen = set()
+    with multiprocessing.Pool(args.jobs) as pool:
+        for turns, crashes in pool.imap_unordered(fuzz_batch, jobs):
+            total_turns += turns
+            for crash in crashes:
+                key = (crash["where"], crash["error"].split(":")[0])
+                path = save_crash(crash)
+                if key not in seen:
+                    seen.add(key)
+                    print(f"CRASH {crash['error']} at {crash['where']} "
+                          f"({len(crash['inputs'])} inputs) -> {path}")
+    elapsed = time.perf_counter() - start
+    print(f"{args.games} games, {total_turns} turns in {elapsed:.1f}s "
+          f"({total_turns / elapsed:,.0f} turns/s), {len(seen)} distinct crash(es)")
+
+if __name__ == "__main__":
+    main_cli()
@@ -1,48 +1,246 @@
+import argparse
+import functools
+import heapq
+import itertools
+import math
 import os
 import platform
+import queue
 import random
+import sys
+import threading
 import time
 from colorama import Fore, Style, init
+try:
+    import numpy as np
+except ImportError:  # the planner falls back to plain Python, just slower
+    np = None
+from collections import Counter, defaultdict
 from dataclasses import dataclass
-import keyboard
+from typing import NamedTuple
 
 init(autoreset=True)
 
+# ----------------------------
+# Input
+# ----------------------------
+class InputSource:
+    """Anything the game can read lines from.
+
+    `options` is the menu being answered when there is one, so automated
+    players can see what they're choosing between.
+    """
+
+    def read_line(self, prompt="", options=None):
+        return input(prompt)
+
+    def skip_requested(self):
+        return False
+
+    def wait_skip(self, seconds):
+        # Sleeps for up to `seconds`, returns True if the player asked to skip
+        time.sleep(seconds)
+        return False
+
+class AutomatedInput(InputSource):
+    """Base for inputs no one is watching: never waits, always skips ahead."""
+
+    def skip_requested(self):
+        return True
+
+    def wait_skip(self, seconds):
+        return True
+
+class TerminalInput(InputSource):
+    """Reads keys on a background thread so nothing typed during printing is lost.
+
+    Finished lines go into a queue (typeahead), and a space pressed while text
+    is printing skips ahead to the next prompt.
+    """
+
+    def __init__(self):
+        self.lines = queue.Queue()
+        self.skip = threading.Event()
+        self._buffer = []
+        self._reading = False  # echo keys only while a prompt is waiting
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        if not sys.stdin.isatty():
+            for line in sys.stdin:
+                self.lines.put(line.rstrip("\r\n"))
+            self.lines.put(None)
+        elif platform.system() == 'Windows':
+            self._run_windows()
+        else:
+            self._run_posix()
+
+    def _run_windows(self):
+        import msvcrt
+        import _thread
+        while True:
+            ch = msvcrt.getwch()
+            if ch in ('\x00', '\xe0'):  # arrow/function keys come as two codes
+                msvcrt.getwch()
+            elif ch == '\x03':
+                _thread.interrupt_main()
+            else:
+                self._feed(ch)
+
+    def _run_posix(self):
+        import atexit
+        import termios
+        import tty
+        fd = sys.stdin.fileno()
+        old = termios.tcgetattr(fd)
+        atexit.register(termios.tcsetattr, fd, termios.TCSADRAIN, old)
+        tty.setcbreak(fd)  # keeps Ctrl-C working, unlike full raw mode
+        while True:
+            data = os.read(fd, 1)
+            if not data:
+                self.lines.put(None)
+                return
+            self._feed(data.decode(errors='ignore'))
+
+    def _feed(self, ch):
+        with self._lock:
+            if ch in ('\r', '\n'):
+                line = ''.join(self._buffer)
+                self._buffer.clear()
+                if self._reading:
+                    print(flush=True)
+                self.lines.put(line)
+                self.skip.set()  # a typed-ahead answer also cuts a pause short
+            elif ch in ('\x7f', '\b'):
+                if self._buffer:
+                    self._buffer.pop()
+                    if self._reading:
+                        print('\b \b', end='', flush=True)
+            elif ch == '\x04' and not self._buffer:
+                self.lines.put(None)
+                self.skip.set()
+            elif ch == ' ' and not self._reading and not self._buffer:
+                self.skip.set()
+            elif ch.isprintable():
+                self._buffer.append(ch)
+                if self._reading:
+                    print(ch, end='', flush=True)
+
+    def read_line(self, prompt="", options=None):
+        self.start()
+        self.skip.clear()
+        try:
+            line = self.lines.get_nowait()
+            print(f"{prompt}{line if line is not None else ''}", flush=True)
+        except queue.Empty:
+            with self._lock:
+                print(prompt + ''.join(self._buffer), end='', flush=True)
+                self._reading = True
+            line = self.lines.get()
+            with self._lock:
+                self._reading = False
+        if line is None:
+            raise EOFError
+        return line
+
+    def skip_requested(self):
+        return self.skip.is_set() or not self.lines.empty()
+
+    def wait_skip(self, seconds):
+        self.start()
+        return self.skip.wait(seconds) or not self.lines.empty()
+
+class ScriptedInput(AutomatedInput):
+    """Feeds a fixed sequence of lines, e.g. for tests or replays."""
+
+    def __init__(self, lines, echo=False):
+        self.lines = iter(lines)
+        self.echo = echo
+
+    def read_line(self, prompt="", options=None):
+        try:
+            line = next(self.lines)
+        except StopIteration:
+            raise EOFError from None
+        if self.echo:
+            print(f"{prompt}{line}")
+        return line
+
+INPUT = TerminalInput()
+
+def set_input(source):
+    """Swaps the active input source and returns the previous one."""
+    global INPUT
+    previous, INPUT = INPUT, source
+    return previous
+
+def read_line(prompt="> ", options=None):
+    return INPUT.read_line(prompt, options)
+
+# Rolls name what they're for ("encounter", "enemy", "combat", "fishing",
+# "gathering", "forage", "events"). They all come from the global generator
+# unless a dice source hands out a stream per purpose, which keeps paired
+# simulations in step when one table changes how many rolls something takes.
+DICE = None
+
+def set_dice(source):
+    """Swaps the dice source, a callable purpose -> random.Random or None for
+    the global generator, and returns the previous one."""
+    global DICE
+    previous, DICE = DICE, source
+    return previous
+
+def dice(purpose):
+    return random if DICE is None else DICE(purpose)
+
 # ----------------------------
 # Utility
 # ----------------------------
 def clear_screen():
+    if not sys.stdout.isatty():
+        return
     if platform.system() == 'Windows':
         os.system('cls')
     else:
         os.system('clear')
 
+def pause(seconds):
+    if sys.stdout.isatty() and not INPUT.skip_requested():
+        INPUT.wait_skip(seconds)
+
 def slow_print(text, delay=0.02):
-    for char in text:
+    if delay <= 0 or not sys.stdout.isatty() or INPUT.skip_requested():
+        print(text)
+        return
+    for i, char in enumerate(text):
         print(char, end='', flush=True)
-        time.sleep(delay)
-        if keyboard.is_pressed(' '): # Checks if the spacebar is pressed
-            remaining_text = text.split(char, 1)[1]
-            print(remaining_text, end='', flush=True)
+        if INPUT.wait_skip(delay): # Spacebar or typeahead skips the rest
+            print(text[i + 1:], end='', flush=True)
             break
     print()
 
 def quick_print(text, delay=0.01):
-    for char in text:
-        print(char, end='', flush=True)
-        time.sleep(delay)
-        if keyboard.is_pressed(' '): # Checks if the spacebar is pressed
-            remaining_text = text.split(char, 1)[1]
-            print(remaining_text, end='', flush=True)
-            break
-    print()
+    slow_print(text, delay)
+
+def menu_index(choice):
+    # Negative entries would otherwise wrap around to the end of the list
+    i = int(choice) - 1
+    if i < 0:
+        raise IndexError(choice)
+    return i
 
 def choose(prompt, options):
     while True:
         slow_print(prompt)
         for key, desc in options.items():
             slow_print(f"[{key}] {desc}")
-        choice = input("> ").strip().lower()
+        choice = read_line("> ", options).strip().lower()
         clear_screen()
         if choice in options:
             return choice
@@ -70,6 +268,21 @@ FISH_POOLS = {
     ],
 }
 
+# Fishing roll thresholds: highest roll for each outcome (None is no catch),
+# anything above the last one is legendary
+FISH_ROLLS = [(40, None), (70, "common"), (85, "rare"), (95, "epic")]
+
+# Forage finds: hunger restored and message (the +1 shown is net of foraging)
+FORAGE_FOOD = {
+    "nuts": (2, "You found some nuts and berries. +1 Hunger"),
+    "mystery": (3, "You're not sure what you found, but the geiger counter didn't beep. +2 Hunger."),
+    "canned": (4, "You found unexpired canned food. +3 Hunger."),
+    "fauna": (5, "You trapped some local fauna and ate a well-cooked meal. +4 Hunger."),
+}
+
+# Lowest spawn roll (0-10) that brings a zombie, None means it's safe
+SPAWN_THRESHOLDS = {"Forest": 8, "Lake": 8, "Nuclear Plant": 6, "Shack": None}
+
 # Weapon shop (name, weapon_mod_damage, cost, is_unique)
 WEAPONS = [
     ("Knife", 1, 5, False),
@@ -127,10 +340,59 @@ CRAFT = [
     ("Shotgun", 15, 20, 20, 7, False, False),
     ("Boat", 75, 50, 20, None, True, True),
 ]
+BOAT_RECIPE = next(c for c in CRAFT if c[6])
+
+# What gathering turns up at each location
+GATHER_AT = {"Forest": "wood", "Lake": "stone", "Nuclear Plant": "machineparts"}
 
 # ----------------------------
 # Player
 # ----------------------------
+# Player fields the effective stats are compiled from
+STAT_INPUTS = frozenset({
+    "base_luck", "rod_luck", "base_damage", "weapon_mod", "dodge", "dodge_mod",
+    "grit", "muscle", "nature", "brains", "charm",
+    "is_scavenger", "is_angler", "is_mechanic", "is_hunter", "is_medic",
+    "is_trader", "is_brawler", "is_farmer", "is_captain", "is_scientist",
+})
+
+class EffectiveStats(NamedTuple):
+    """Base stats, gear, attributes and class bonuses folded into what rolls use."""
+    luck: int
+    damage: int
+    dodge: int
+    fishing_bonus: int   # added to the fishing roll
+    forage_bonus: int    # added to the forage roll
+    flee_bonus: int      # added to the flee roll
+    sale_mult: float     # fish sales
+    money_mult: float    # every other source of money
+    craft_cost_mult: float
+    gauze_heal: tuple    # (min, max) HP
+    forage_hunger: int   # extra hunger when foraging finds food
+
+def compile_stats(p) -> EffectiveStats:
+    luck = p.base_luck + p.rod_luck
+    trader = 1.10 if p.is_trader else 1.0
+    damage = p.base_damage + p.weapon_mod + p.muscle * 0.5
+    return EffectiveStats(
+        luck=luck,
+        # Hunter rounds up so the +10% counts at low damage too
+        damage=math.ceil(round(damage * 1.10, 6)) if p.is_hunter else int(damage),
+        dodge=int(p.dodge + p.dodge_mod + p.grit * 1.5 + (15 if p.is_brawler else 0)),
+        fishing_bonus=int(luck * (1.10 if p.is_angler else 1.0) * 2.5),
+        forage_bonus=int((luck + p.nature * 0.5) * (1.15 if p.is_scavenger else 1.0) * 1.8),
+        flee_bonus=int(luck * 1.5),
+        sale_mult=(1 + p.charm * 0.015) * trader,
+        money_mult=trader,
+        craft_cost_mult=0.75 if p.is_mechanic else 1.0,
+        gauze_heal=(2, 4) if p.is_medic else (1, 3),
+        forage_hunger=2 if p.is_farmer else 0,
+    )
+
+def scaled(amount, mult):
+    """Money times a multiplier, left as it was when there's no bonus."""
+    return amount if mult == 1 else round(amount * mult, 2)
+
 class Player:
     def __init__(self):
         # Core stats
@@ -185,34 +447,54 @@ class Player:
         self.cookbook = False
         self.name = ""
         self.location = "Forest"
+        self.area = None  # grid cell on a generated map, see World
+        self.camp = None  # where the player arrived on a generated map
         self.turns = 0
         self.hasboat = False
+        self.cause_of_death = None
+        self._stats = None
+
+    def __setattr__(self, name, value):
+        # Any change to gear, attributes or class drops the compiled stats
+        if name in STAT_INPUTS:
+            self.__dict__["_stats"] = None
+        object.__setattr__(self, name, value)
+
+    @property
+    def effective(self) -> EffectiveStats:
+        if self._stats is None:
+            self._stats = compile_stats(self)
+        return self._stats
 
     @property
     def total_luck(self):
-        return self.base_luck + self.rod_luck
+        return self.effective.luck
 
     @property
     def total_damage(self):
-        return self.base_damage + self.weapon_mod
+        return self.effective.damage
     
     @property
     def total_dodge(self):
-        return self.dodge + self.dodge_mod
+        return self.effective.dodge
     
     def statscore(self):
         print(f"\n{self.name}: HP {self.health}/{self.max_health} || HUNGER: {self.hunger} || XP: {self.xp}/{self.xp_until_level} || ${self.money}")
-        print(f"LOCATION: {self.location} || DAY: {(self.turns // 3) + 1} || TIME: {['Morning', 'Noon', 'Night'][self.turns % 3]}")
+        area = current_area(self)
+        where = f"{area.name} ({self.location})" if area else self.location
+        print(f"LOCATION: {where} || DAY: {(self.turns // 3) + 1} || TIME: {['Morning', 'Noon', 'Night'][self.turns % 3]}")
         print("________________________________________________________________")
 
     def stats(self):
         print(f"\nNAME: {self.name}")
         print(f"HEALTH: {self.health}/{self.max_health}")
-        print(f"DAMAGE: {self.total_damage} (base {self.base_damage} + weapon {self.weapon_mod})")
+        damage = f"base {self.base_damage} + weapon {self.weapon_mod} + muscle {self.muscle * 0.5}"
+        print(f"DAMAGE: {self.total_damage} ({damage}{', +10% hunter' if self.is_hunter else ''})")
         print(f"LUCK: {self.total_luck} (base {self.base_luck} + rod {self.rod_luck})")
         print(f"HUNGER: {self.hunger}")
         print(f"XP: {self.xp}/{self.xp_until_level}")
-        print(f"DODGE: {self.total_dodge} (base {self.dodge} + armor {self.dodge_mod})")
+        dodge = f"base {self.dodge} + armor {self.dodge_mod} + grit {self.grit * 1.5}"
+        print(f"DODGE: {self.total_dodge} ({dodge}{' + brawler 15' if self.is_brawler else ''})")
         print("\n--- ATTRIBUTES ---")
         print(f"GRIT: {self.grit} (+{self.grit * 1.5} Dodge)")
         print(f"MUSCLE: {self.muscle} (+{self.muscle * 0.5} Base Damage)")
@@ -246,6 +528,33 @@ class Player:
             ability_str = f" ({', '.join(abilities)})" if abilities else ""
             print(f" - {enemy.name}{ability_str}: HP {enemy.hp_min}-{enemy.hp_max}, DMG {enemy.dmg_min}-{enemy.dmg_max}, Dodge Target {enemy.dodge_target}, Flee DC {enemy.flee_dc}")
 
+    def snapshot(self):
+        """Immutable copy of this player for lookahead, see GameState."""
+        fish = None
+        for species in self.fish_list:
+            fish = (species, fish)
+        return GameState(
+            location=self.location, health=self.health, max_health=self.max_health,
+            hunger=self.hunger, money=self.money, wood=self.wood, stone=self.stone,
+            machineparts=self.machineparts, base_luck=self.base_luck, rod_luck=self.rod_luck,
+            base_damage=self.base_damage, weapon_mod=self.weapon_mod, dodge=self.dodge,
+            dodge_mod=self.dodge_mod, cookbook=self.cookbook, hasboat=self.hasboat,
+            turns=self.turns, fish_counts=tuple(self.fish_counts[c] for c in FISH_POOLS),
+            stats=self.effective, fish=fish, armor_items=tuple(self.armor_items), unique_items=tuple(self.unique_items),
+            area=self.area,
+        )
+
+    def restore(self, state):
+        """Loads a snapshot back into this player. Attributes and class aren't
+        part of snapshots, so they stay as they are."""
+        for name in GameState._fields:
+            if name not in ("fish_counts", "stats", "fish", "armor_items", "unique_items", "escaped"):
+                setattr(self, name, getattr(state, name))
+        self.fish_counts = dict(zip(FISH_POOLS, state.fish_counts))
+        self.fish_list = state.fish_list()
+        self.armor_items = list(state.armor_items)
+        self.unique_items = list(state.unique_items)
+
     def update_stats(self):
         self.hunger = min(self.hunger, 10)
         self.health = min(self.health, self.max_health)
@@ -254,7 +563,7 @@ class Player:
             self.health -= 1
             slow_print("You are starving! -1 HP")
 
-@dataclass
+@dataclass(frozen=True)
 class EnemyType:
     name: str
     hp_min: int
@@ -278,7 +587,7 @@ CRAWLER = EnemyType(name="Crawler", hp_min=4, hp_max=8, dmg_min=2, dmg_max=4, re
 ENEMIES = [ZOMBIE, SCRAMBLER, BRUTE, BUSTER, CRAWLER]
  
 def run_combat(player, enemy: EnemyType):
-    rng = random
+    rng = dice("combat")
     zombie_hp = rng.randint(enemy.hp_min, enemy.hp_max)
 
     combat_dodge = False   # +20 to THIS enemy attack if you repositioned
@@ -289,19 +598,27 @@ def run_combat(player, enemy: EnemyType):
         print(f"{enemy.name.upper()} HP: {zombie_hp} | Your HP: {player.health}")
 
         # ---------- action menu (block flee/reposition if grappled) ----------
-        actions = {"1": "Attack", "3": "Distract", "4": "Use Gauze"}
+        actions = {"1": "Attack", "3": "Distract", "4": "Use Gauze", "6": "Auto-battle..."}
         if not grappled:
             actions["2"] = "Reposition (+20 Dodge)"
             actions["5"] = "Flee"
         action = choose("What do you do?", dict(sorted(actions.items())))
 
+        if action == "6":
+            options = {str(i): text for i, text in enumerate(TACTICS.values(), start=1)}
+            options["0"] = "Go Back"
+            pick = choose("How should the fight go?", options)
+            if pick == "0":
+                continue
+            return auto_combat(player, enemy, zombie_hp, grappled, list(TACTICS)[int(pick) - 1])
+
         # -------------------- your turn --------------------
         if action == "1": # Attacking
-            dmg = rng.randint(0, 4) + player.total_damage
+            dmg = rng.randint(0, 4) + player.effective.damage
             slow_print(f"You hit the {enemy.name.upper()} for {dmg}!")
             zombie_hp -= dmg
             if zombie_hp <= 0:
-                reward = rng.randint(enemy.reward_min, enemy.reward_max)
+                reward = scaled(rng.randint(enemy.reward_min, enemy.reward_max), player.effective.money_mult)
                 if reward > 0:
                     slow_print(f"You killed the {enemy.name.upper()}! You got ${reward}.")
                     player.money += reward
@@ -321,7 +638,7 @@ def run_combat(player, enemy: EnemyType):
 
         elif action == "4":  # Use Gauze
             if "Gauze" in player.armor_items:
-                heal = rng.randint(1, 3)
+                heal = rng.randint(*player.effective.gauze_heal)
                 player.health = min(player.health + heal, player.max_health)
                 player.armor_items.remove("Gauze")
                 slow_print(f"You use a piece of Gauze to heal yourself. +{heal} HP.")
@@ -332,7 +649,7 @@ def run_combat(player, enemy: EnemyType):
             if grappled:
                 slow_print("You're grappled! You can't flee this turn.")
             else:
-                escape = rng.randint(0, 20) + int(player.total_luck * 1.5)
+                escape = rng.randint(0, 20) + player.effective.flee_bonus
                 if escape >= enemy.flee_dc:
                     slow_print("You successfully got away!")
                     return "escaped"
@@ -341,7 +658,7 @@ def run_combat(player, enemy: EnemyType):
 
         # -------------------- enemy turn --------------------
         z_dmg = rng.randint(enemy.dmg_min, enemy.dmg_max)
-        dodge_roll = rng.randint(0, 100) + player.total_dodge + (20 if combat_dodge else 0)
+        dodge_roll = rng.randint(0, 100) + player.effective.dodge + (20 if combat_dodge else 0)
         dodged = (dodge_roll >= enemy.dodge_target)
 
         if dodged:
@@ -370,12 +687,113 @@ def run_combat(player, enemy: EnemyType):
 
     return "dead" if player.health <= 0 else "won"
 
+# Auto-battle tactics and what they're called in the menu
+TACTICS = {
+    "attack": "Fight to the end",
+    "guarded": "Fight, run once a hit could kill you",
+    "flee": "Run for it",
+}
+
+def flee_odds(enemy: EnemyType, flee_bonus):
+    """Chance that one Flee gets away."""
+    return min(max(21 - (enemy.flee_dc - flee_bonus), 0), 21) / 21
+
+def tactic_move(tactic, enemy: EnemyType, health, can_flee):
+    """Combat menu key `tactic` picks this round: "1" to attack, "5" to flee."""
+    if can_flee and (tactic == "flee" or (tactic == "guarded" and health <= enemy.dmg_max)):
+        return "5"
+    return "1"
+
+@functools.lru_cache(maxsize=4096)
+def fight_odds(enemy: EnemyType, zombie_hp, health, grappled, damage, dodge, flee_bonus, tactic="attack"):
+    """Exact outcome distribution of the rest of a run_combat fight played by
+    `tactic`, from the round the zombie has `zombie_hp` left.
+
+    Returns {(result, health_left): probability}, result being "won",
+    "escaped" or "dead".
+    """
+    hit_chance = min(max(enemy.dodge_target - dodge, 0), 101) / 101
+    flee_chance = flee_odds(enemy, flee_bonus)
+    enemy_dmg = range(enemy.dmg_min, enemy.dmg_max + 1)
+    outcomes = defaultdict(float)
+    fights = {(zombie_hp, health, grappled): 1.0}
+
+    while fights:
+        next_round = defaultdict(float)
+        for (zombie_hp, hp, grappled), p in fights.items():
+            if tactic_move(tactic, enemy, hp, not grappled and flee_chance > 0) == "5":
+                outcomes["escaped", hp] += p * flee_chance
+                standing = [(zombie_hp, p * (1 - flee_chance))]
+            else:
+                standing = []
+                for roll in range(5):
+                    left = zombie_hp - (roll + damage)
+                    if left <= 0:
+                        outcomes["won", hp] += p / 5
+                    else:
+                        standing.append((left, p / 5))
+            for left, q in standing:
+                # A dodge breaks a grapple, a hit from a grappler starts one
+                after = [(hp, False, q * (1 - hit_chance))]
+                after += [(hp - d, enemy.is_grappler, q * hit_chance / len(enemy_dmg)) for d in enemy_dmg]
+                for hp_after, held, r in after:
+                    if hp_after <= 0:
+                        outcomes["dead", 0] += r
+                    elif enemy.is_buster:
+                        outcomes["escaped", hp_after] += r
+                    elif r > 1e-15:
+                        next_round[left, hp_after, held] += r
+        fights = next_round
+    return dict(outcomes)
+
+@functools.lru_cache(maxsize=4096)
+def odds_table(odds, *key):
+    """odds(*key), fight_odds() or combat_odds(), as (outcomes, cumulative
+    weights) for random.choices."""
+    table = odds(*key)
+    return list(table), list(itertools.accumulate(table.values()))
+
+@functools.lru_cache(maxsize=1024)
+def combat_odds(enemy: EnemyType, damage, dodge, health):
+    """Outcome distribution of a whole run_combat fight when the player only
+    attacks, over every HP the zombie could start with. Same shape as fight_odds()."""
+    outcomes = defaultdict(float)
+    spread = enemy.hp_max - enemy.hp_min + 1
+    for zombie_hp in range(enemy.hp_min, enemy.hp_max + 1):
+        for key, p in fight_odds(enemy, zombie_hp, health, False, damage, dodge, 0, "attack").items():
+            outcomes[key] += p / spread
+    return dict(outcomes)
+
+def auto_combat(player, enemy: EnemyType, zombie_hp, grappled, tactic):
+    """Settles the rest of a fight in one step, drawn from the same odds as
+    playing `tactic` round by round. Returns what run_combat would."""
+    stats = player.effective
+    outcomes, weights = odds_table(fight_odds, enemy, zombie_hp, player.health, grappled,
+                                   stats.damage, stats.dodge, stats.flee_bonus, tactic)
+    rng = dice("combat")
+    result, health = rng.choices(outcomes, cum_weights=weights)[0]
+    slow_print(f"You settle in: {TACTICS[tactic].lower()}. You lose {player.health - health} HP.")
+    player.health = health
+
+    if result == "won":
+        reward = scaled(rng.randint(enemy.reward_min, enemy.reward_max), stats.money_mult)
+        if reward > 0:
+            slow_print(f"You killed the {enemy.name.upper()}! You got ${reward}.")
+            player.money += reward
+        else:
+            slow_print(f"You killed the {enemy.name.upper()}!")
+    elif result == "escaped":
+        slow_print(f"You got away from the {enemy.name.upper()}.")
+    else:
+        slow_print("You collapse...")
+    return result
+
 # ----------------------------
 # Character creation
 # ----------------------------
 def character_creation(player: Player):
     slow_print("Welcome to Zombie Pro Fisher - Byte Sized!")
-    time.sleep(1)
+    pause(1)
     slow_print("\n--- Character Customization ---\n")
 
     eye = choose("Choose eye color:", {
@@ -405,34 +823,241 @@ def character_creation(player: Player):
     elif size == "2": player.base_damage += 1
     elif size == "3": player.max_health += 2
 
-    player.name = input("Now, what is your hero's name? ")
+    player.name = read_line("Now, what is your hero's name? ")
     player.health = player.max_health
 
     slow_print("\nStarting your journey now! Here are your stats:")
     player.stats()
 
-    player.location = random.choice(LOCATIONS)
+    if WORLD is None:
+        player.location = random.choice(LOCATIONS)
+        arrival = player.location
+    else:
+        area = WORLD.area(WORLD.spawn_point())
+        player.area, player.location = area.id, area.kind
+        player.camp = area.id
+        arrival = area.name
     slow_print("\nSPAWNING CHARACTER...")
-    time.sleep(2)
-    slow_print(f"You arrive at the {player.location.upper()}.")
+    pause(2)
+    slow_print(f"You arrive at the {arrival.upper()}.")
+
+# ----------------------------
+# World
+# ----------------------------
+# A generated map is a grid of areas, each one of the LOCATIONS kinds with its
+# own spawn, fishing and gathering numbers. player.location stays the kind so
+# everything keyed on it keeps working; player.area is the grid cell.
+WORLD = None  # None plays the classic four locations
+
+AREA_KINDS = [("Forest", 40), ("Lake", 30), ("Nuclear Plant", 15), ("Shack", 15)]
+AREA_NAMES = {
+    "Forest": (["Pine", "Birch", "Cedar", "Hollow", "Old Growth", "Burnt"], ["Woods", "Forest", "Thicket"]),
+    "Lake": (["North", "Muddy", "Quiet", "Reed", "Stony", "Misty"], ["Shore", "Cove", "Bay"]),
+    "Nuclear Plant": (["East", "West", "Flooded", "Dark", "Upper"], ["Reactor Wing", "Turbine Hall", "Control Wing"]),
+    "Shack": (["Hutchinson's", "Old", "Leaning", "Trapper's"], ["Shack", "Cabin"]),
+}
+DIRECTIONS = {"n": "North", "e": "East", "s": "South", "w": "West"}
+CHUNK = 16          # areas are rolled CHUNK x CHUNK at a time
+CHUNK_CACHE = 256   # chunks kept loaded
+ROUTE_CACHE = 4096  # routes kept
+ROUTE_LIMIT = 2000  # areas a route search looks at before giving up
+SAFE_STEP = 1e-3    # per-step cost on safest routes, so safe detours stay short
+
+class Area(NamedTuple):
+    """One map cell, with the outcome tables rolled for it when its chunk loaded."""
+    id: int
+    kind: str
+    name: str
+    threshold: int         # lowest spawn roll that brings a zombie, None means it's safe
+    encounter: float       # chance of a zombie at the start of a turn here
+    fish_shift: int        # added to fishing rolls
+    gather: tuple          # (fewest, most) resources per gather
+
+class World:
+    """A width x height grid of areas, rolled lazily from a seed.
+
+    Neighbours in a row are always joined. Rows are joined at the west edge
+    and through random gaps further along, so every area can be reached, and
+    the gaps come from hashing the seed so no chunk is loaded to find them.
+    """
+
+    def __init__(self, areas, seed=None):
+        self.width = max(2, math.isqrt(max(areas, 1) - 1) + 1)
+        self.height = max(1, -(-areas // self.width))
+        self.seed = random.randrange(2 ** 32) if seed is None else seed
+
+    def __len__(self):
+        return self.width * self.height
+
+    def area(self, area_id) -> Area:
+        x, y = area_id % self.width, area_id // self.width
+        return _load_chunk(self, x // CHUNK, y // CHUNK)[area_id]
+
+    def gap(self, area_id):
+        """Whether the way south out of an area is open."""
+        return area_id % self.width == 0 or hash((self.seed, area_id)) % 5 < 3
+
+    def neighbours(self, area_id):
+        """[(direction key, area id)] for every open way out of an area."""
+        width = self.width
+        x = area_id % width
+        out = []
+        if area_id >= width and self.gap(area_id - width):
+            out.append(("n", area_id - width))
+        if x + 1 < width:
+            out.append(("e", area_id + 1))
+        if area_id + width < len(self) and self.gap(area_id):
+            out.append(("s", area_id + width))
+        if x:
+            out.append(("w", area_id - 1))
+        return out
+
+    def spawn_point(self, rng=random):
+        return rng.randrange(len(self))
+
+@functools.lru_cache(maxsize=CHUNK_CACHE)
+def _load_chunk(world, cx, cy):
+    """Rolls every area of one chunk; the same seed always rolls the same areas."""
+    rng = random.Random(f"{world.seed}:{cx}:{cy}")
+    kinds, weights = zip(*AREA_KINDS)
+    areas = {}
+    for y in range(cy * CHUNK, min((cy + 1) * CHUNK, world.height)):
+        for x in range(cx * CHUNK, min((cx + 1) * CHUNK, world.width)):
+            kind = rng.choices(kinds, weights)[0]
+            prefixes, suffixes = AREA_NAMES[kind]
+            threshold = SPAWN_THRESHOLDS[kind]
+            if threshold is not None:
+                threshold = min(max(threshold + rng.randint(-2, 2), 1), 11)
+            low = rng.randint(0, 1)
+            area_id = y * world.width + x
+            areas[area_id] = Area(
+                area_id, kind, f"{rng.choice(prefixes)} {rng.choice(suffixes)}",
+                threshold, 0.0 if threshold is None else (11 - threshold) / 11,
+                rng.randint(-10, 10) if kind == "Lake" else 0,
+                (low, low + rng.randint(4, 6)))
+    return areas
+
+def _search(world, start, is_goal, safest, estimate=None, limit=None):
+    """Cheapest path after `start` to an area id passing `is_goal`, or None.
+
+    Steps cost 1, or on safest routes the odds of meeting a zombie on arrival
+    (as -log of getting through). `estimate` is an A* lower bound to the goal.
+    """
+    best = {start: 0.0}
+    came_from = {}
+    frontier = [(0.0, 0.0, start)]  # (estimated total, -cost, area), deepest first on ties
+    while frontier:
+        _, cost, here = heapq.heappop(frontier)
+        cost = -cost
+        if cost > best[here]:
+            continue
+        if here != start and is_goal(here):
+            path = []
+            while here != start:
+                path.append(here)
+                here = came_from[here]
+            return tuple(reversed(path))
+        if limit is not None and len(best) > limit:
+            return None
+        for _, other in world.neighbours(here):
+            total = cost + (SAFE_STEP - math.log1p(-world.area(other).encounter) if safest else 1.0)
+            if total < best.get(other, math.inf):
+                best[other] = total
+                came_from[other] = here
+                heapq.heappush(frontier, (total + (estimate(other) if estimate else 0.0), -total, other))
+    return None
+
+@functools.lru_cache(maxsize=ROUTE_CACHE)
+def route(world, start, goal, safest=False):
+    """Areas to walk through from start to goal, shortest or least likely to
+    meet a zombie. None if the goal is too far to find."""
+    if start == goal:
+        return ()
+    gx, gy = goal % world.width, goal // world.width
+    floor = SAFE_STEP if safest else 1.0
+
+    def estimate(area_id):
+        return floor * (abs(area_id % world.width - gx) + abs(area_id // world.width - gy))
+
+    return _search(world, start, goal.__eq__, safest, estimate, ROUTE_LIMIT)
+
+@functools.lru_cache(maxsize=ROUTE_CACHE)
+def nearest(world, start, kind, safest=True):
+    """Route to the closest other area of `kind`, None if none is close enough."""
+    return _search(world, start, lambda area_id: world.area(area_id).kind == kind, safest,
+                   limit=ROUTE_LIMIT)
+
+def set_world(world):
+    """Plays on `world` (None for the classic map), returns the previous one."""
+    global WORLD
+    previous, WORLD = WORLD, world
+    return previous
+
+def current_area(player):
+    if WORLD is None or player.area is None:
+        return None
+    return WORLD.area(player.area)
+
+def travel(player: Player):
+    """Change location on a generated map: a step to a neighbour, or a step
+    along the safest route towards the nearest area of a kind or back to camp."""
+    here = current_area(player)
+    options = {}
+    for i, kind in enumerate(LOCATIONS, start=1):
+        path = nearest(WORLD, here.id, kind, True)
+        if path:
+            options[str(i)] = f"Safest way to a {kind.upper()} ({len(path)} steps)"
+    home = route(WORLD, here.id, player.camp, True) if player.camp is not None else None
+    if home:
+        options["c"] = f"Safest way back to the {WORLD.area(player.camp).name} ({len(home)} steps)"
+    neighbours = dict(WORLD.neighbours(here.id))
+    for key, other in neighbours.items():
+        area = WORLD.area(other)
+        options[key] = f"{DIRECTIONS[key]}: {area.name} ({area.kind})"
+    options["0"] = "Stay"
+    pick = choose("Where would you like to go? Traveling is dangerous and takes time.", options)
+    if pick == "0":
+        return
+    if pick in neighbours:
+        target = neighbours[pick]
+    elif pick == "c":
+        target = home[0]
+    else:
+        target = nearest(WORLD, here.id, LOCATIONS[int(pick) - 1], True)[0]
+    area = WORLD.area(target)
+    player.area, player.location = area.id, area.kind
+    slow_print(f"You travel to the {area.name}.")
 
 # ----------------------------
 # Encounters
 # ----------------------------
 
+@functools.lru_cache(maxsize=None)
+def encounter_chance(location):
+    threshold = SPAWN_THRESHOLDS.get(location)
+    return 0.0 if threshold is None else (11 - threshold) / 11
+
+def spawn_chance(player):
+    area = current_area(player)
+    return area.encounter if area else encounter_chance(player.location)
+
 def zombie_encounter(player):
-    if player.location == "Shack":
+    area = current_area(player)
+    threshold = area.threshold if area else SPAWN_THRESHOLDS.get(player.location)
+    if threshold is None:
         return False
 
-    spawn = random.randint(0, 10)
-    risky = (spawn >= 8 and player.location != "Shack") or (spawn >= 6 and player.location == "Nuclear Plant")
-    if not risky:
+    spawn = dice("encounter").randint(0, 10)
+    if spawn < threshold:
         return False
-    
-    enemy = random.choice(ENEMIES)
+    return ambush(player)
+
+def ambush(player):
+    enemy = dice("enemy").choice(ENEMIES)
 
     result = run_combat(player, enemy)
     if result == "dead":
+        player.cause_of_death = enemy.name
         return True
     return False
 
@@ -443,7 +1068,7 @@ def forage(player: Player):
         slow_print("You're not sure there's anything safe to eat here...")
         player.hunger -= 1
         # Stranger (Hudson) encounter (as per C++ flow)
-        if random.randint(0, 10) == 5:
+        if dice("forage").randint(0, 10) == 5:
             slow_print("\nYou search through the maze of Seqouyah Power Plant.")
             slow_print("Upon approaching a janitor's closet, you hear someone.")
             slow_print("You carefully open the door. To your surprise, it's a man in withered clothes.")
@@ -456,7 +1081,7 @@ def forage(player: Player):
             })
             if c1 == "3":
                 slow_print("Without a second thought you put an end to the hoodlum's life. +$10")
-                player.money += 10
+                player.money += scaled(10, player.effective.money_mult)
                 return
             if c1 == "1":
                 slow_print("STRANGER: Ker... ker something... Kerhuddy? Krudson? It's been... so long. I was looking for the code!")
@@ -470,7 +1095,7 @@ def forage(player: Player):
             })
             if c2 == "3":
                 slow_print("Without a second thought you put an end to the hoodlum's life. +$10")
-                player.money += 10
+                player.money += scaled(10, player.effective.money_mult)
                 return
             if c2 == "1":
                 slow_print("STRANGER: Hahaha! The code! But, of course, you can't see it. You're not awakened!")
@@ -484,7 +1109,7 @@ def forage(player: Player):
             })
             if c3 == "3":
                 slow_print("Without a second thought you put an end to the hoodlum's life. +$10")
-                player.money += 10
+                player.money += scaled(10, player.effective.money_mult)
                 return
             if c3 == "2":
                 slow_print("STRANGER: I-Its here... somewhere! The code! Hahaha!")
@@ -510,61 +1135,196 @@ def forage(player: Player):
 
     # Normal forage
     player.hunger -= 1
-    result = random.randint(-10, 32) + int(player.total_luck * 1.8)
-    if result <= 0:
+    rng = dice("forage")
+    result = rng.randint(-10, 32) + player.effective.forage_bonus
+    outcome = forage_outcome(result, player.cookbook)
+    if outcome == "nothing":
         slow_print("You found nothing.")
-    elif (1 <= result <= 10 and not player.cookbook) or (0 <= result <= 5 and player.cookbook):
-        hp_loss = random.randint(1, 3)
+    elif outcome == "poison":
+        hp_loss = rng.randint(1, 3)
         player.health -= hp_loss
         slow_print(f"Yuck! You ate something you shouldn't have. -{hp_loss} HP.")
-    elif (11 <= result <= 20 and not player.cookbook) or (6 <= result <= 20 and player.cookbook):
-        slow_print("You found some nuts and berries. +1 Hunger")
-        player.hunger += 2
-    elif 21 <= result <= 25:
-        slow_print("You're not sure what you found, but the geiger counter didn't beep. +2 Hunger.")
-        player.hunger += 3
-    elif 26 <= result <= 30:
-        slow_print("You found unexpired canned food. +3 Hunger.")
-        player.hunger += 4
-    elif 31 <= result <= 40:
-        slow_print("You trapped some local fauna and ate a well-cooked meal. +4 Hunger.")
-        player.hunger += 5
+        if player.health <= 0:
+            player.cause_of_death = "Poison"
+    elif outcome is not None:
+        hunger, message = FORAGE_FOOD[outcome]
+        slow_print(message)
+        player.hunger += hunger + player.effective.forage_hunger
+
+def forage_outcome(result, cookbook=False):
+    if result <= 0:
+        return "nothing"
+    if result <= (5 if cookbook else 10):
+        return "poison"
+    if result <= 20:
+        return "nuts"
+    if result <= 25:
+        return "mystery"
+    if result <= 30:
+        return "canned"
+    if result <= 40:
+        return "fauna"
+    return None  # lucky rolls past the table find nothing at all
+
+def fish_category(roll):
+    for top, category in FISH_ROLLS:
+        if roll <= top:
+            return category
+    return "legendary"
 
 def fishing(player: Player):
     player.hunger -= 1
-    roll = random.randint(0, 100) + int(player.total_luck * 2.5)
+    area = current_area(player)
+    rng = dice("fishing")
+    roll = rng.randint(0, 100) + player.effective.fishing_bonus + (area.fish_shift if area else 0)
 
-    if roll <= 40:
+    category = fish_category(roll)
+    if category is None:
         slow_print("You didn't catch any fish today...")
         return
-    elif 41 <= roll <= 70:
-        category = "common"
-    elif 71 <= roll <= 85:
-        category = "rare"
-    elif 86 <= roll <= 95:
-        category = "epic"
-    else:  # >=96
-        category = "legendary"
-
-    species = random.choice(FISH_POOLS[category])
+
+    species = rng.choice(FISH_POOLS[category])
     slow_print(f"You caught a {species}!")
     player.fish_list.append(species)
     player.fish_counts[category] += 1
 
 def gather(player: Player, resource: str):
-    amount = random.randint(0, 5)
+    area = current_area(player)
+    amount = dice("gathering").randint(*(area.gather if area else (0, 5)))
     slow_print(f"You gathered {amount} pieces of {resource}.")
+    add_resource(player, resource, amount)
+    player.hunger -= 1
+
+def add_resource(player: Player, resource: str, amount):
     if resource == "wood":
         player.wood += amount
     elif resource == "stone":
         player.stone += amount
     elif resource == "machinery":
         player.machineparts += amount
-    player.hunger -= 1
+
+# ----------------------------
+# Repeated actions
+# ----------------------------
+# Actions that can be repeated from the main menu: (menu text, action)
+REPEATABLE = {
+    "Forest": {"1": ("Gather wood", "wood")},
+    "Lake": {"1": ("Go fishing", "fish"), "2": ("Gather rocks", "stone")},
+    "Nuclear Plant": {"1": ("Gather machine parts", "machinery")},
+}
+HUNGRY_AT = 3  # where "until hungry" stops
+
+@functools.lru_cache(maxsize=None)
+def gather_totals(turns, width=5):
+    """Cumulative weights of the total from `turns` gather rolls of 0-`width`."""
+    counts = [1]
+    for _ in range(turns):
+        counts = [sum(counts[max(0, t - width):t + 1]) for t in range(len(counts) + width)]
+    return list(itertools.accumulate(counts))
+
+@functools.lru_cache(maxsize=None)
+def fishing_odds(bonus):
+    """Chance of each catch category (None for no fish) for a roll bonus."""
+    odds = Counter(fish_category(roll + bonus) for roll in range(101))
+    return {category: n / 101 for category, n in odds.items()}
+
+@functools.lru_cache(maxsize=None)
+def binomial_totals(trials, chance):
+    """Cumulative weights of the number of successes in `trials` tries."""
+    return list(itertools.accumulate(
+        math.comb(trials, k) * chance ** k * (1 - chance) ** (trials - k)
+        for k in range(trials + 1)))
+
+def catch_totals(turns, bonus):
+    """Samples how many fish of each category `turns` fishing trips bring in."""
+    caught = {}
+    left, mass = turns, 1.0
+    odds = list(fishing_odds(bonus).items())
+    rng = dice("fishing")
+    for category, chance in odds[:-1]:
+        share = round(min(chance / mass, 1.0), 12) if mass > 0 else 0.0
+        count = rng.choices(range(left + 1), cum_weights=binomial_totals(left, share))[0]
+        caught[category] = count
+        left -= count
+        mass -= chance
+    caught[odds[-1][0]] = left
+    return caught
+
+def quiet_turns(chance, limit):
+    """How many of the next `limit` turn starts pass without a zombie, when
+    each brings one with `chance`."""
+    if chance <= 0:
+        return limit
+    if chance >= 1:
+        return 0
+    return min(int(math.log(1 - dice("encounter").random()) / math.log(1 - chance)), limit)
+
+def repeat_action(player: Player, action, turns):
+    """Does `action` for up to `turns` turns in one step.
+
+    Returns True if a zombie turns up part way; it attacks at the start of
+    the next turn.
+    """
+    area = current_area(player)
+    done = quiet_turns(spawn_chance(player), turns - 1) + 1
+    player.turns += done - 1
+    player.hunger -= done
+
+    if action == "fish":
+        caught = []
+        bonus = player.effective.fishing_bonus + (area.fish_shift if area else 0)
+        for category, count in catch_totals(done, bonus).items():
+            if category and count:
+                player.fish_counts[category] += count
+                caught += [dice("fishing").choice(FISH_POOLS[category]) for _ in range(count)]
+        player.fish_list += caught
+        slow_print(f"You fished for {done} turn(s) and caught: {', '.join(caught) if caught else 'nothing'}.")
+    else:
+        low, high = area.gather if area else (0, 5)
+        amount = done * low + dice("gathering").choices(range((high - low) * done + 1),
+                                                        cum_weights=gather_totals(done, high - low))[0]
+        add_resource(player, action, amount)
+        slow_print(f"You gathered for {done} turn(s) and got {amount} pieces of {action}.")
+
+    if done < turns:
+        slow_print("You hear something shambling towards you...")
+        return True
+    return False
+
+def repeat_menu(player: Player):
+    actions = REPEATABLE[player.location]
+    options = {key: name for key, (name, _) in actions.items()}
+    options["0"] = "Go Back"
+    pick = choose("Repeat which action?", options)
+    if pick == "0":
+        return False
+
+    slow_print("For how many turns? (e.g. x20, or leave blank to go until hungry)")
+    answer = read_line("> ").strip().lower().removeprefix("x")
+    if answer in ("", "until hungry"):
+        turns = player.hunger - HUNGRY_AT
+        if turns < 1:
+            slow_print("You're already hungry. Find something to eat first.")
+            return False
+    else:
+        try:
+            turns = int(answer)
+        except ValueError:
+            turns = 0
+        if turns < 1:
+            slow_print("Invalid entry.")
+            return False
+    if turns > player.hunger:
+        slow_print(f"You'll need to eat before then. Going for {max(player.hunger, 1)} turn(s).")
+    return repeat_action(player, actions[pick][1], max(1, min(turns, player.hunger)))
 
 # ----------------------------
 # Shop (overhauled)
 # ----------------------------
+def craft_cost(player: Player, wood, stone, machineparts):
+    mult = player.effective.craft_cost_mult
+    return math.ceil(wood * mult), math.ceil(stone * mult), math.ceil(machineparts * mult)
+
 def shop(player: Player):
     hutchinson_dialogues = [
         "\n HUTCHINSON: It's good to see a friendly face. Here's my shop.",
@@ -596,13 +1356,14 @@ def shop(player: Player):
 
             slow_print("WEAPON SHOP:")
             for idx, (name, mod, cost, unique) in enumerate(available_weapons, start=1):
-                slow_print(f"[{idx}] {name:<22} +{mod} DMG  - ${cost}")
+                eta = shop_eta(player, money=cost)
+                slow_print(f"[{idx}] {name:<22} +{mod} DMG  - ${cost:<4} ({eta})")
             slow_print(f"[0] Go Back")
-            choice = input("> ").strip()
+            choice = read_line("> ").strip()
             if choice == "0":
                 continue
             try:
-                i = int(choice) - 1
+                i = menu_index(choice)
                 name, mod, cost, unique = available_weapons[i]
             except (ValueError, IndexError):
                 slow_print("Invalid choice.")
@@ -621,23 +1382,24 @@ def shop(player: Player):
         elif action == "2":
             # compute cashout
             cc = player.fish_counts
-            total_cash = (
+            total_cash = round((
                 cc["common"] * SELL_VALUES["common"] +
                 cc["rare"] * SELL_VALUES["rare"] +
                 cc["epic"] * SELL_VALUES["epic"] +
                 cc["legendary"] * SELL_VALUES["legendary"]
-            )
+            ) * player.effective.sale_mult, 2)
             
             available_rods = [r for r in RODS if not r[3] or r[0] not in player.unique_items]
             
             slow_print("FISHING GOODS:")
             for idx, (name, rluck, cost, unique) in enumerate(available_rods, start=1):
-                slow_print(f"[{idx}] {name:<18} +{rluck} Luck - ${cost}")
+                eta = shop_eta(player, money=cost)
+                slow_print(f"[{idx}] {name:<18} +{rluck} Luck - ${cost:<4} ({eta})")
             slow_print(f"[s] Sell your fish (+${total_cash})")
             slow_print("[0] Goodbye")
             slow_print(f"You currently have: {', '.join(player.fish_list) if player.fish_list else 'None'}")
 
-            choice = input("> ").strip().lower()
+            choice = read_line("> ").strip().lower()
             if choice == "0":
                 continue
             elif choice == "s":
@@ -651,7 +1413,7 @@ def shop(player: Player):
                     slow_print("You have no fish to sell.")
             else:
                 try:
-                    i = int(choice) - 1
+                    i = menu_index(choice)
                     name, rluck, cost, unique = available_rods[i]
                 except (ValueError, IndexError):
                     slow_print("Invalid choice.")
@@ -681,11 +1443,11 @@ def shop(player: Player):
                 slow_print(f"[{idx}] {name:<25} {desc:<18} - ${cost}")
             slow_print("[0] Goodbye")
 
-            choice = input("> ").strip()
+            choice = read_line("> ").strip()
             if choice == "0":
                 continue
             try:
-                i = int(choice) - 1
+                i = menu_index(choice)
                 name, typ, val, cost, unique = available_armor[i]
             except (ValueError, IndexError):
                 slow_print("Invalid choice.")
@@ -717,20 +1479,23 @@ def shop(player: Player):
 
             slow_print("CRAFTABLE ITEMS:")
             for idx, (name, w, s, p, mod, unique, isBoat) in enumerate(available_crafts, start=1):
+                w, s, p = craft_cost(player, w, s, p)
+                eta = shop_eta(player, wood=w, stone=s, machineparts=p)
                 if isBoat:
-                    slow_print(f"[{idx}] {name:<10} {w} wood, {s} stone, {p} machine parts")
+                    slow_print(f"[{idx}] {name:<10} {w} wood, {s} stone, {p} machine parts  ({eta})")
                 else:
-                    slow_print(f"[{idx}] {name:<10} {w} wood, {s} stone, {p} machine parts  -> +{mod} DMG")
+                    slow_print(f"[{idx}] {name:<10} {w} wood, {s} stone, {p} machine parts  -> +{mod} DMG  ({eta})")
             slow_print("[0] Goodbye")
-            choice = input("> ").strip()
+            choice = read_line("> ").strip()
             if choice == "0":
                 continue
             try:
-                i = int(choice) - 1
+                i = menu_index(choice)
                 name, w, s, p, mod, unique, isBoat = available_crafts[i]
             except (ValueError, IndexError):
                 slow_print("Invalid choice.")
                 continue
+            w, s, p = craft_cost(player, w, s, p)
 
             if player.wood >= w and player.stone >= s and player.machineparts >= p:
                 player.wood -= w
@@ -764,11 +1529,11 @@ def shop(player: Player):
                     slow_print(f"[{idx}] {name:<22} +{val} Hunger - ${cost}")
             slow_print("[0] Goodbye")
 
-            choice = input("> ").strip()
+            choice = read_line("> ").strip()
             if choice == "0":
                 continue
             try:
-                i = int(choice) - 1
+                i = menu_index(choice)
                 name, val, cost, unique = available_food[i]
             except (ValueError, IndexError):
                 slow_print("Invalid choice.")
@@ -789,6 +1554,463 @@ def shop(player: Player):
             slow_print("MR HUTCHINSON: Thanks for checking out my shop!")
             break
 
+# ----------------------------
+# Planning
+# ----------------------------
+RESOURCE_SITES = {"wood": "Forest", "stone": "Lake", "machineparts": "Nuclear Plant"}
+QUARTERS = 4  # fish sell for multiples of $0.25, so money is planned in quarters
+PLAN_CUTOFF = 1e-6  # chance left over when a turn distribution is cut off
+
+class Site(NamedTuple):
+    """Where the planner sends the player to work at a kind of location, see plan_sites()."""
+    kind: str
+    encounter: float   # chance of a zombie per turn there
+    gather: tuple      # (fewest, most) resources per gather
+    fish_shift: int    # added to fishing rolls
+    distance: int      # turns of travel from where the player stands
+
+class Estimate(NamedTuple):
+    turns: dict  # {turns needed: probability}, ignoring death
+    death_risk: float
+
+    @property
+    def mean(self):
+        return sum(t * p for t, p in self.turns.items())
+
+    def percentile(self, q):
+        seen = 0.0
+        for t in sorted(self.turns):
+            seen += self.turns[t]
+            if seen >= q:
+                return t
+        return max(self.turns)
+
+class PassageTable:
+    """Turns for a running total of i.i.d. rolls to reach any deficit up to `limit`.
+
+    `step` is ((amount, probability), ...) in whole units. Totals never go
+    down, so P(reached d by turn t) is P(total after t turns >= d); keeping
+    that tail for every d answers all deficits from one convolution.
+    """
+
+    def __init__(self, step, limit):
+        self.limit = limit
+        self.tails = []  # per turn, [d] = P(total >= d)
+        if np is not None:
+            self._build_numpy(step, limit)
+            return
+        dist = [0.0] * (limit + 1)  # the last slot holds `limit` or more
+        dist[0] = 1.0
+        while dist[limit] < 1 - PLAN_CUTOFF:
+            after = [0.0] * (limit + 1)
+            for total, p in enumerate(dist):
+                if p < 1e-15:
+                    continue
+                for amount, q in step:
+                    after[min(total + amount, limit)] += p * q
+            dist = after
+            self.tails.append(list(itertools.accumulate(reversed(dist)))[::-1])
+
+    def _build_numpy(self, step, limit):
+        # Same convolution, one shifted array add per possible amount
+        dist = np.zeros(limit + 1)
+        dist[0] = 1.0
+        tails = []
+        while dist[limit] < 1 - PLAN_CUTOFF:
+            after = np.zeros(limit + 1)
+            for amount, q in step:
+                amount = min(amount, limit)
+                after[amount:limit] += q * dist[:limit - amount]
+                after[limit] += q * dist[limit - amount:].sum()
+            dist = after
+            tails.append(np.cumsum(dist[::-1])[::-1])
+        self.tails = np.array(tails)
+
+    def passage(self, deficit):
+        """{turns: probability} to reach `deficit`, exact up to PLAN_CUTOFF."""
+        if deficit <= 0:
+            return {0: 1.0}
+        dist, before = {}, 0.0
+        for t, tail in enumerate(self.tails, start=1):
+            reached = float(tail[deficit])
+            if reached > before:
+                dist[t] = reached - before
+                before = reached
+        return dist
+
+@functools.lru_cache(maxsize=None)
+def _gather_table(low, high, limit):
+    return PassageTable(tuple((n, 1 / (high - low + 1)) for n in range(low, high + 1)), limit)
+
+@functools.lru_cache(maxsize=None)
+def _income_table(bonus, sale_mult, limit):
+    step = tuple((round(SELL_VALUES[c] * sale_mult * QUARTERS) if c else 0, p)
+                 for c, p in fishing_odds(bonus).items())
+    return PassageTable(step, limit)
+
+@functools.lru_cache(maxsize=1024)
+def gather_passage(deficit, low=0, high=5):
+    """Gathering turns to collect `deficit` when each brings low-high."""
+    limit = max([deficit] + [max(c[1:4]) for c in CRAFT])
+    return _gather_table(low, high, limit).passage(deficit)
+
+@functools.lru_cache(maxsize=1024)
+def income_passage(deficit, bonus, sale_mult=1.0):
+    """Fishing turns to earn `deficit` quarters, selling everything caught."""
+    limit = max([deficit] + [item[2] * QUARTERS for item in WEAPONS + RODS])
+    return _income_table(bonus, sale_mult, limit).passage(deficit)
+
+@functools.lru_cache(maxsize=None)
+def forage_net_hunger(bonus, cookbook, extra=0):
+    """Average hunger gained per forage turn, after the 1 it costs. `extra`
+    is added whenever food is found."""
+    gains = [FORAGE_FOOD.get(forage_outcome(r + bonus, cookbook), (0,))[0] for r in range(-10, 33)]
+    return sum(g + extra if g else 0 for g in gains) / len(gains) - 1
+
+def convolve(a, b):
+    out = defaultdict(float)
+    for x, p in a.items():
+        for y, q in b.items():
+            out[x + y] += p * q
+    return out
+
+@functools.lru_cache(maxsize=None)
+def death_chance(chance, damage, dodge, health):
+    """Chance that one turn where a zombie turns up with `chance` ends in a fatal fight."""
+    if not chance:
+        return 0.0
+    return chance * sum(combat_odds(e, damage, dodge, health).get(("dead", 0), 0.0)
+                        for e in ENEMIES) / len(ENEMIES)
+
+@functools.lru_cache(maxsize=4096)
+def _estimate(deficits, quarters, stats, cookbook, hunger, sites, fight):
+    site_of = {site.kind: site for site in sites}
+    legs = []
+    for resource, deficit in deficits:
+        if deficit > 0:
+            site = site_of[RESOURCE_SITES[resource]]
+            legs.append((gather_passage(deficit, *site.gather), site))
+    if quarters > 0:
+        lake = site_of["Lake"]
+        legs.append((income_passage(quarters, stats.fishing_bonus + lake.fish_shift, stats.sale_mult), lake))
+    if any(site.distance is None for _, site in legs) or site_of["Shack"].distance is None:
+        return None
+
+    # Work per site as {turns: (probability, survival-weighted probability)}
+    work = {0: (1.0, 1.0)}
+    for dist, site in legs:
+        safe = 1 - death_chance(site.encounter, *fight)
+        combined = defaultdict(lambda: [0.0, 0.0])
+        for t, (p, ps) in work.items():
+            for u, q in dist.items():
+                combined[t + u][0] += p * q
+                combined[t + u][1] += ps * q * safe ** u
+        work = {t: tuple(v) for t, v in combined.items()}
+
+    # Hunger runs out after `hunger` working turns, then forage to keep going
+    net = max(forage_net_hunger(stats.forage_bonus, cookbook, stats.forage_hunger), 0.1)
+    forage_safe = 1 - death_chance(site_of["Forest"].encounter, *fight)
+    # Each place is its distance away, then back to the Shack to buy or craft
+    stops = list(dict.fromkeys(site for _, site in legs))
+    shack = site_of["Shack"].distance
+    travel = sum(site.distance for site in stops) + (max(shack, 1) if stops else shack)
+    travel_safe = math.prod((1 - death_chance(site.encounter, *fight)) ** site.distance
+                            for site in stops)
+
+    turns = defaultdict(float)
+    survive = 0.0
+    for t, (p, ps) in work.items():
+        short = max(0, t - hunger)
+        forage = math.ceil(short / net)
+        turns[t + forage + travel] += p
+        survive += ps * forage_safe ** forage
+    return Estimate(dict(turns), 1 - survive * travel_safe)
+
+def plan_sites(player: Player):
+    """A Site per location kind: on a generated map the current area or the
+    nearest one of that kind (distance None if none is close enough), on the
+    classic map the shared tables one turn away."""
+    here = current_area(player)
+    sites = []
+    for kind in LOCATIONS:
+        if here is None:
+            sites.append(Site(kind, encounter_chance(kind), (0, 5), 0, int(kind != player.location)))
+        elif here.kind == kind:
+            sites.append(Site(kind, here.encounter, here.gather, here.fish_shift, 0))
+        else:
+            path = nearest(WORLD, here.id, kind, True)
+            area = WORLD.area(path[-1]) if path else None
+            sites.append(Site(kind, area.encounter, area.gather, area.fish_shift, len(path)) if area
+                         else Site(kind, 0.0, (0, 5), 0, None))
+    return tuple(sites)
+
+def estimate_cost(player: Player, wood=0, stone=0, machineparts=0, money=0):
+    """Turns needed to afford a cost in resources and money, with the chance
+    of dying first. None if a place the work needs is out of reach.
+
+    Gathering and fishing turns are exact first-passage distributions, added
+    by convolution, from the tables of the places plan_sites() picks. Forage
+    turns come from the average hunger a forage brings in, and each place
+    costs its distance in travel. Fights are scored at the player's current
+    health.
+    """
+    stats = player.effective
+    have = sum(SELL_VALUES[c] * n for c, n in player.fish_counts.items()) * stats.sale_mult + player.money
+    deficits = (("wood", wood - player.wood), ("stone", stone - player.stone),
+                ("machineparts", machineparts - player.machineparts))
+    quarters = max(0, math.ceil((money - have) * QUARTERS))
+    fight = (stats.damage, stats.dodge, max(player.health, 1))
+    return _estimate(deficits, quarters, stats, player.cookbook, max(player.hunger, 0),
+                     plan_sites(player), fight)
+
+def plan(player: Player, target):
+    """Estimate for anything in CRAFT, WEAPONS or RODS, looked up by name."""
+    for name, w, s, p, *_ in CRAFT:
+        if name == target:
+            w, s, p = craft_cost(player, w, s, p)
+            return estimate_cost(player, wood=w, stone=s, machineparts=p)
+    for name, _, cost, _ in WEAPONS + RODS:
+        if name == target:
+            return estimate_cost(player, money=cost)
+    raise KeyError(target)
+
+def estimate_text(estimate: Estimate):
+    if estimate is None:
+        return "too far to tell"
+    if not estimate.turns or max(estimate.turns) == 0:
+        return "ready now"
+    return f"~{estimate.mean:.0f} turns, {estimate.death_risk:.0%} risk"
+
+SHOP_ESTIMATES = True  # turned off for bulk runs that never read the shop
+
+def shop_eta(player: Player, **cost):
+    return estimate_text(estimate_cost(player, **cost)) if SHOP_ESTIMATES else "no estimate"
+
+# ----------------------------
+# Snapshots and hints
+# ----------------------------
+class GameState(NamedTuple):
+    """Immutable snapshot of a Player for tree search.
+
+    Forking is free since nothing can change a state, and _replace() builds
+    a new tuple that shares every field it doesn't change. Caught fish are a
+    linked list of (species, rest) pairs so adding one is O(1).
+    """
+    location: str
+    health: int
+    max_health: int
+    hunger: int
+    money: float
+    wood: int
+    stone: int
+    machineparts: int
+    base_luck: int
+    rod_luck: int
+    base_damage: int
+    weapon_mod: int
+    dodge: int
+    dodge_mod: int
+    cookbook: bool
+    hasboat: bool
+    turns: int
+    fish_counts: tuple  # in FISH_POOLS order
+    stats: EffectiveStats
+    fish: tuple = None
+    armor_items: tuple = ()
+    unique_items: tuple = ()
+    escaped: bool = False
+    area: int = None  # grid cell on a generated map, see World
+
+    @property
+    def total_luck(self):
+        return self.stats.luck
+
+    @property
+    def total_damage(self):
+        return self.stats.damage
+
+    @property
+    def total_dodge(self):
+        return self.stats.dodge
+
+    def fish_list(self):
+        species, node = [], self.fish
+        while node:
+            species.append(node[0])
+            node = node[1]
+        return species[::-1]
+
+FISH_CATEGORIES = tuple(FISH_POOLS)
+
+def state_actions(state: GameState):
+    """Moves available from `state`, roughly the main menu's.
+
+    On a generated map "go <kind>" is one step towards the nearest area of
+    that kind, like the travel menu, and only offered if there is one.
+    """
+    actions = _actions_at(state.location, state.hasboat)
+    if WORLD is None or state.area is None:
+        return actions
+    return tuple(a for a in actions if not a.startswith("go ")
+                 or nearest(WORLD, state.area, a[3:], True))
+
+def _state_area(s: GameState, changes):
+    area = changes.get("area", s.area)
+    return None if WORLD is None or area is None else WORLD.area(area)
+
+@functools.lru_cache(maxsize=None)
+def _actions_at(location, hasboat):
+    actions = ["go " + loc for loc in LOCATIONS if loc != location]
+    if location == "Shack":
+        actions += ["shop", "rest"]
+    else:
+        actions += ["forage", "gather"]
+    if location == "Lake":
+        actions.append("fish")
+        if hasboat:
+            actions.append("sail")
+    return tuple(actions)
+
+def _shop(s: GameState):
+    """Sell the catch, build the boat if possible, then eat and heal."""
+    money = s.money + sum(SELL_VALUES[c] * n for c, n in zip(FISH_CATEGORIES, s.fish_counts)) * s.stats.sale_mult
+    changes = {"fish_counts": (0,) * len(FISH_CATEGORIES), "fish": None}
+    name, w, st, p = BOAT_RECIPE[:4]
+    if not s.hasboat and s.wood >= w and s.stone >= st and s.machineparts >= p:
+        changes.update(wood=s.wood - w, stone=s.stone - st, machineparts=s.machineparts - p, hasboat=True)
+    hunger = s.hunger
+    for food, value, cost, _ in sorted(FOOD[:3], key=lambda f: -f[1]):
+        while hunger < 7 and money >= cost:
+            hunger += value
+            money -= cost
+    health = s.health
+    kit = ARMOR[0]
+    while health <= s.max_health - kit[2] and money >= kit[3]:
+        health += kit[2]
+        money -= kit[3]
+    changes.update(money=money, hunger=hunger, health=health)
+    return changes
+
+def step(state: GameState, action, rng=random):
+    """Plays one turn of `action` on a snapshot and returns the new snapshot.
+
+    Mirrors the main loop, including the next turn's hunger check and zombie
+    roll, with fights resolved by always attacking.
+    """
+    s = state
+    if action == "sail":
+        return s._replace(escaped=True)
+
+    changes = {}
+    here = _state_area(s, changes)
+    if action.startswith("go ") and here:
+        there = WORLD.area(nearest(WORLD, here.id, action[3:], True)[0])
+        changes.update(location=there.kind, area=there.id)
+    elif action.startswith("go "):
+        changes["location"] = action[3:]
+    elif action == "forage":
+        if s.location == "Nuclear Plant":
+            found = scaled(10, s.stats.money_mult) if rng.randint(0, 10) == 5 else 0
+            changes.update(hunger=s.hunger - 1, money=s.money + found)
+        else:
+            kind = forage_outcome(rng.randint(-10, 32) + s.stats.forage_bonus, s.cookbook)
+            food = FORAGE_FOOD.get(kind, (0,))[0]
+            changes["hunger"] = s.hunger - 1 + food + (s.stats.forage_hunger if food else 0)
+            if kind == "poison":
+                changes["health"] = s.health - rng.randint(1, 3)
+    elif action == "gather":
+        resource = GATHER_AT[s.location]
+        amount = rng.randint(*(here.gather if here else (0, 5)))
+        changes.update({resource: getattr(s, resource) + amount, "hunger": s.hunger - 1})
+    elif action == "fish":
+        changes["hunger"] = s.hunger - 1
+        shift = here.fish_shift if here else 0
+        category = fish_category(rng.randint(0, 100) + s.stats.fishing_bonus + shift)
+        if category:
+            i = FISH_CATEGORIES.index(category)
+            changes["fish_counts"] = s.fish_counts[:i] + (s.fish_counts[i] + 1,) + s.fish_counts[i + 1:]
+            changes["fish"] = (rng.choice(FISH_POOLS[category]), s.fish)
+    elif action == "shop":
+        changes = _shop(s)
+
+    # Start of the next turn
+    hunger = min(changes.get("hunger", s.hunger), 10)
+    health = min(changes.get("health", s.health), s.max_health)
+    if hunger < 0:
+        hunger, health = 0, health - 1
+    changes.update(hunger=hunger, health=health, turns=s.turns + 1)
+    arrived = _state_area(s, changes)
+    chance = arrived.encounter if arrived else encounter_chance(changes.get("location", s.location))
+    if health > 0 and rng.random() < chance:
+        enemy = rng.choice(ENEMIES)
+        outcomes, weights = odds_table(combat_odds, enemy, s.stats.damage, s.stats.dodge, health)
+        result, changes["health"] = rng.choices(outcomes, cum_weights=weights)[0]
+        if result == "won":
+            reward = scaled(rng.randint(enemy.reward_min, enemy.reward_max), s.stats.money_mult)
+            changes["money"] = changes.get("money", s.money) + reward
+    return s._replace(**changes)
+
+def rollout_score(state: GameState):
+    """1 for escaping, 0 for dying, in between for progress towards the boat."""
+    if state.escaped:
+        return 1.0
+    if state.health <= 0:
+        return 0.0
+    name, w, st, p = BOAT_RECIPE[:4]
+    if state.hasboat:
+        progress = 1.0
+    else:
+        progress = (min(state.wood, w) + min(state.stone, st) + min(state.machineparts, p)) / (w + st + p)
+    return 0.2 + 0.6 * progress
+
+def rollout(state: GameState, depth, rng=random):
+    for _ in range(depth):
+        if state.escaped or state.health <= 0:
+            break
+        state = step(state, rng.choice(state_actions(state)), rng)
+    return rollout_score(state)
+
+def best_action(state: GameState, rollouts=2000, depth=25, rng=random):
+    """Picks the root move with the best average rollout, spreading rollouts by UCB1.
+
+    Returns (action, estimated score).
+    """
+    actions = state_actions(state)
+    visits = dict.fromkeys(actions, 0)
+    totals = dict.fromkeys(actions, 0.0)
+    for n in range(1, rollouts + 1):
+        if n <= len(actions):
+            action = actions[n - 1]
+        else:
+            action = max(actions, key=lambda a: totals[a] / visits[a]
+                         + math.sqrt(2 * math.log(n) / visits[a]))
+        visits[action] += 1
+        totals[action] += rollout(step(state, action, rng), depth, rng)
+    best = max(actions, key=lambda a: visits[a])
+    return best, totals[best] / visits[best]
+
+HINT_ROLLOUTS = 2000
+
+HINT_TEXT = {
+    "forage": "Forage for food.",
+    "gather": "Gather what you can here.",
+    "fish": "Go fishing.",
+    "shop": "Visit Mr. Hutchinson's shop.",
+    "rest": "Rest by the fire.",
+    "sail": "Sail away!",
+}
+
+def hint(player: Player):
+    # Lookahead gets its own generator so asking for a hint doesn't change the game
+    action, _ = best_action(player.snapshot(), HINT_ROLLOUTS, rng=random.Random())
+    if action in HINT_TEXT:
+        text = HINT_TEXT[action]
+    elif WORLD is not None:
+        text = f"Head for the nearest {action[3:]}."
+    else:
+        text = f"Head to the {action[3:]}."
+    slow_print(f"Your gut tells you: {text}")
+
 # ----------------------------
 # Main loop
 # ----------------------------
@@ -796,15 +2018,20 @@ def main():
     clear_screen()
     player = Player()
     character_creation(player)
+    play(player)
 
+def play(player: Player):
+    ambushed = False  # set when a repeated action was cut short by a zombie
     while player.health > 0:
         player.turns += 1
         player.update_stats()
-        weeks = player.turns // 7
-        days = player.turns // 3
+        if player.health <= 0:
+            player.cause_of_death = "Starvation"
+            break
 
-        if zombie_encounter(player):
+        if ambush(player) if ambushed else zombie_encounter(player):
             break
+        ambushed = False
 
         player.statscore()
 
@@ -821,12 +2048,17 @@ def main():
             options.update({"4": "Gather machine parts", "5": "Listen to echoes"})
         elif player.location == "Shack":
             options.update({"4": "Interact with Mr. Hutchinson", "5": "Rest by the fire"})
+        if player.location in REPEATABLE:
+            options.update({"7": "Repeat an action..."})
 
         choice = choose("Choose an action:", options)
 
         if choice == "1":
             forage(player)
 
+        elif choice == "2" and WORLD is not None:
+            travel(player)
+
         elif choice == "2":
             locs = {"1": "Forest", "2": "Lake", "3": "Nuclear Plant", "4": "Shack"}
             loc_choice = choose("Where would you like to go? Traveling is dangerous and takes time.", {
@@ -846,6 +2078,7 @@ def main():
                 "1": "View Stats",
                 "2": "View Bag",
                 "3": "View Almanac",
+                "5": "Ask for a hint",
                 "4": "Go Back"
                 })
 
@@ -855,6 +2088,8 @@ def main():
                     player.inventory()
                 elif inv_choice == "3":
                     player.almanac()
+                elif inv_choice == "5":
+                    hint(player)
                 elif inv_choice == "4":
                     break
 
@@ -870,7 +2105,7 @@ def main():
 
         elif choice == "5":
             if player.location == "Forest":
-                event = random.randint(1, 4)
+                event = dice("events").randint(1, 4)
                 if event == 1:
                     slow_print("The birds are lively today. +1 HP.")
                     player.health = min(player.health + 1, player.max_health)
@@ -888,7 +2123,7 @@ def main():
                 gather(player, "stone")
 
             elif player.location == "Nuclear Plant":
-                event = random.randint(1, 4)
+                event = dice("events").randint(1, 4)
                 if event == 1:
                     slow_print("You hear the humming of a machine. It gives you hope. +1 HP.")
                     player.health = min(player.health + 1, player.max_health)
@@ -899,11 +2134,14 @@ def main():
                     player.base_damage = max(1, player.base_damage - 1)
                 elif event == 4:
                     slow_print("You hear metal drop in the distance. It's your lucky day. +$1.")
-                    player.money += 1
+                    player.money += scaled(1, player.effective.money_mult)
 
             elif player.location == "Shack":
                 slow_print("The fire reminds you of home.")
 
+        elif choice == "7":
+            ambushed = repeat_menu(player)
+
         elif choice == "6" and player.location == "Lake" and player.hasboat:
             slow_print("After weeks of survival...")
             b1 = choose("A) Board the boat...\nB) No -- your work here isn't finished.",
@@ -917,11 +2155,21 @@ def main():
                     weeks = player.turns // 7
                     days = player.turns % 7
                     slow_print(f"You escaped after surviving for {weeks} week(s) and {days} day(s). ({player.turns} turns). Congratulations!!")
-                    return
+                    return "escaped"
 
+    weeks = player.turns // 7
+    days = player.turns % 7
     slow_print("\nGame Over. You survived for:")
-    slow_print(f"{weeks % 4} week(s), and {days % 7} day(s). ({player.turns} turns).")
+    slow_print(f"{weeks} week(s), and {days} day(s). ({player.turns} turns).")
     slow_print("\nThanks for playing Zombie Pro Fisher - Byte Sized!")
+    return "dead"
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Zombie Pro Fisher")
+    parser.add_argument("--world", type=int, metavar="AREAS",
+                        help="play on a generated map of about this many areas")
+    parser.add_argument("--world-seed", type=int, help="same seed, same map")
+    args = parser.parse_args()
+    if args.world:
+        set_world(World(args.world, args.world_seed))
     main()
\ No newline at end of file
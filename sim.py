@@ -0,0 +1,246 @@
+"""Headless games played by a scripted bot through the real menus.
+
+Used by the analysis tools; the bot answers every prompt through read_line()
+so the game code that runs is exactly what a player would hit.
+"""
+import contextlib
+import os
+import random
+from collections import Counter
+from dataclasses import dataclass, field
+
+import main
+
+# Character creation answers (eye, hair, size) for each build
+BUILDS = {
+    "luck": "111",
+    "damage": "222",
+    "health": "333",
+    "mixed": "123",
+}
+
+# Columns of a per-turn trace (name, array typecode, labelled), see tracestore
+TRACE_FIELDS = [
+    ("game", "q", False),
+    ("turn", "i", False),
+    ("action", "B", True),
+    ("location", "B", True),
+    ("health", "h", False),
+    ("hunger", "h", False),
+    ("money", "d", False),
+    ("wood", "i", False),
+    ("stone", "i", False),
+    ("machineparts", "i", False),
+    ("outcome", "B", True),  # "playing" until the last row of a game
+]
+
+def _discard(*args, **kwargs):
+    pass
+
+@contextlib.contextmanager
+def headless():
+    """Drops all game output. Menus still render their text, nobody sees it."""
+    saved = main.slow_print, main.clear_screen
+    main.slow_print = main.clear_screen = _discard
+    try:
+        with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+            yield
+    finally:
+        main.slow_print, main.clear_screen = saved
+
+def menu_entry(items, name, owned, unique_at=3):
+    """Menu key for `name` in a shop list, after owned unique items are hidden."""
+    available = [item for item in items if not item[unique_at] or item[0] not in owned]
+    return str([item[0] for item in available].index(name) + 1)
+
+class CoupledRandom(random.Random):
+    """Draws whole numbers by scaling one uniform, so moving the end of a
+    range shifts the result a little instead of rolling a new one."""
+
+    def _randbelow(self, n):
+        return int(self.random() * n)
+
+class TurnDice:
+    """A generator per (seed, turn, purpose) for main.set_dice, so a change
+    that adds or drops a combat roll leaves that turn's fishing, gathering
+    and encounters where they were."""
+
+    def __init__(self, seed, player):
+        self.seed = seed
+        self.player = player
+        self.turn = None
+        self.streams = {}
+
+    def __call__(self, purpose):
+        if self.player.turns != self.turn:
+            self.turn, self.streams = self.player.turns, {}
+        stream = self.streams.get(purpose)
+        if stream is None:
+            stream = self.streams[purpose] = CoupledRandom(f"{self.seed}:{self.turn}:{purpose}")
+        return stream
+
+class Bot(main.AutomatedInput):
+    """Grinds boat resources, fishes for money and sails once the boat is built."""
+
+    def __init__(self, player, build, max_turns=1000, resync=None, trace=None, game=0):
+        self.player = player
+        self.plan = list(BUILDS.get(build, build)) + ["Bot"]
+        self.max_turns = max_turns
+        self.resync = resync
+        self.trace = trace
+        self.game = game
+        self.caught = Counter()
+        self._seen = dict(player.fish_counts)
+
+    def _count_fish(self):
+        for category, count in self.player.fish_counts.items():
+            if count > self._seen[category]:
+                self.caught[category] += count - self._seen[category]
+            self._seen[category] = count
+
+    def read_line(self, prompt="", options=None):
+        if self.player.turns > self.max_turns:
+            raise EOFError
+        self._count_fish()
+        if self.plan:
+            return self.plan.pop(0)
+        if options is None:
+            return "0"
+        labels = set(options.values())
+        if "Attack" in labels:
+            return "1"
+        if "Forage" in labels:
+            if self.resync is not None:
+                # Same dice every turn no matter what happened before, so two
+                # games that differ in one number stay comparable
+                random.seed(f"{self.resync}:{self.player.turns}")
+            key = self.take_turn()
+            if self.trace is not None:
+                self.record(options.get(key, key))
+            return key
+        if "a" in options:
+            return "a"  # board the boat and set sail
+        if "Goodbye" in labels:
+            return "6"  # leave the shop once the plan is done
+        return "3" if "3" in options else next(iter(options))
+
+    def record(self, action, outcome="playing"):
+        p = self.player
+        self.trace.append(self.game, p.turns, action, p.location, p.health, p.hunger,
+                          p.money, p.wood, p.stone, p.machineparts, outcome)
+
+    def _go(self, location):
+        self.plan = [str(main.LOCATIONS.index(location) + 1)]
+        return "2"
+
+    def take_turn(self):
+        p = self.player
+        fish_value = sum(main.SELL_VALUES[c] * n for c, n in p.fish_counts.items())
+        cash = p.money + fish_value
+        can_build = all(have >= need for have, need in
+                        zip((p.wood, p.stone, p.machineparts), main.BOAT_RECIPE[1:4]))
+
+        if p.hasboat:
+            if p.location != "Lake":
+                return self._go("Lake")
+            self.plan = ["a", "a"]
+            return "6"
+
+        needs_shop = (can_build
+                      or (p.hunger <= 4 and cash >= 6)
+                      or (p.health <= p.max_health // 2 and cash >= 5)
+                      or len(p.fish_list) >= 8)
+        if needs_shop:
+            if p.location != "Shack":
+                return self._go("Shack")
+            self.plan = self.shop_plan(cash, can_build)
+            return "4"
+
+        if p.hunger <= 4:
+            if p.location not in ("Forest", "Lake"):
+                return self._go("Forest")
+            return "1"
+
+        if p.money + fish_value < 15:
+            if p.location != "Lake":
+                return self._go("Lake")
+            return "4"
+
+        # Gather whatever the boat is furthest from
+        deficits = [(1 - have / need, place, key) for have, need, place, key in (
+            (p.wood, main.BOAT_RECIPE[1], "Forest", "4"),
+            (p.stone, main.BOAT_RECIPE[2], "Lake", "5"),
+            (p.machineparts, main.BOAT_RECIPE[3], "Nuclear Plant", "4"),
+        )]
+        _, place, key = max(deficits)
+        if p.location != place:
+            return self._go(place)
+        return key
+
+    def shop_plan(self, cash, can_build):
+        p = self.player
+        plan = []
+        if p.fish_list:
+            plan += ["2", "s"]
+        if can_build:
+            plan += ["4", menu_entry(main.CRAFT, main.BOAT_RECIPE[0], p.unique_items, unique_at=5)]
+        hunger = p.hunger
+        while hunger < 7:
+            # Best food still affordable, the cookbook isn't food
+            meals = [f for f in main.FOOD if isinstance(f[1], int) and f[2] <= cash]
+            if not meals:
+                break
+            name, value, cost, _ = max(meals, key=lambda f: f[1])
+            plan += ["5", menu_entry(main.FOOD, name, p.unique_items)]
+            hunger += value
+            cash -= cost
+        if p.health <= p.max_health - 2 and cash >= 5:
+            plan += ["3", menu_entry(main.ARMOR, "Medkit", p.unique_items, unique_at=4)]
+            cash -= 5
+        for key, items, have in (("2", main.RODS, p.rod_luck), ("1", main.WEAPONS, p.weapon_mod)):
+            # Next upgrade is the cheapest item that beats what's equipped
+            available = [item for item in items if not item[3] or item[0] not in p.unique_items]
+            better = [(cost, i) for i, (_, value, cost, _) in enumerate(available, start=1) if value > have]
+            if better:
+                cost, i = min(better)
+                if cash >= cost + 10:
+                    plan += [key, str(i)]
+                    cash -= cost
+        return plan
+
+@dataclass
+class GameResult:
+    build: str
+    outcome: str  # "escaped", "dead" or "timeout"
+    turns: int
+    money: float
+    cause_of_death: str = None
+    fish: Counter = field(default_factory=Counter)
+
+def run_game(seed, build="mixed", max_turns=1000, resync=False, trace=None, world=None):
+    """Plays one game. With `resync` every turn's rolls come from streams
+    keyed by (seed, turn, purpose), see TurnDice, instead of running on from
+    the game seed. A `trace`
+    (tracestore.TraceWriter over TRACE_FIELDS) gets a row per turn, and a
+    `world` (main.World) replaces the classic map."""
+    random.seed(seed)
+    player = main.Player()
+    bot = Bot(player, build, max_turns, seed if resync else None, trace, seed)
+    previous = main.set_input(bot)
+    previous_world = main.set_world(world)
+    previous_dice = main.set_dice(TurnDice(seed, player) if resync else None)
+    try:
+        with headless():
+            main.character_creation(player)
+            outcome = main.play(player)
+    except EOFError:
+        outcome = "timeout"
+    finally:
+        main.set_input(previous)
+        main.set_world(previous_world)
+        main.set_dice(previous_dice)
+    bot._count_fish()
+    if trace is not None:
+        bot.record("end", outcome)
+    return GameResult(build, outcome, player.turns, player.money,
+                      player.cause_of_death, bot.caught)
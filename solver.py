@@ -0,0 +1,342 @@
+"""Optimal play for Zombie Pro Fisher by value iteration.
+
+The main loop is abstracted into a finite MDP over location, health, hunger,
+money, boat resources, gear tier and whether the boat is built. Continuous
+quantities are kept on a few grid points and moved between neighbouring
+points with probabilities that preserve their expected value. Odds come
+straight from the game's roll tables (fishing, forage, gather, encounter and
+combat), so balance changes in main.py show up here.
+
+Simplifications: fish are sold the moment they're caught, combat always
+attacks, each shop purchase takes its own turn and the Nuclear Plant
+stranger is always robbed for $10.
+
+Needs numpy and scipy:
+
+    python solver.py
+    python solver.py --hp 6 --money 0,5,10,20,40,80,160 --gear 4
+"""
+import argparse
+import time
+
+import numpy as np
+from scipy import sparse
+
+import main
+
+RESOURCES = ("wood", "stone", "machineparts")
+
+class Axis:
+    """One state dimension, kept on a sorted grid of representative values."""
+
+    def __init__(self, name, points):
+        self.name = name
+        self.points = np.asarray(points, dtype=float)
+
+    def __len__(self):
+        return len(self.points)
+
+    def spread(self, values):
+        """Splits raw values between the two nearest grid points.
+
+        Returns (low index, high index, weight of high), preserving the mean.
+        """
+        p = self.points
+        v = np.clip(values, p[0], p[-1])
+        lo = np.clip(np.searchsorted(p, v, side="right") - 1, 0, max(len(p) - 2, 0))
+        hi = np.minimum(lo + 1, len(p) - 1)
+        gap = p[hi] - p[lo]
+        w = np.where(gap > 0, (v - p[lo]) / np.where(gap > 0, gap, 1), 0.0)
+        return lo, hi, np.clip(w, 0.0, 1.0)
+
+def grid(top, count, bottom=0):
+    return np.unique(np.round(np.linspace(bottom, top, count)))
+
+def gear_ladder(tiers):
+    """Gear tier k is the k-th weapon plus the k-th rod from the shop."""
+    ladder = [(0, 0, 0)]  # (weapon mod, rod luck, cost of this upgrade)
+    for (_, mod, wcost, _), (_, luck, rcost, _) in list(zip(main.WEAPONS, main.RODS))[:tiers - 1]:
+        ladder.append((mod, luck, wcost + rcost))
+    return ladder
+
+def roll_odds(rolls, bonus, outcome):
+    """Chance of each outcome of a uniform roll plus a per-state bonus.
+
+    Returns {outcome: probability array over the states}.
+    """
+    rolls = list(rolls)
+    kinds, inverse = np.unique(bonus, return_inverse=True)
+    odds = {}
+    for i, b in enumerate(kinds):
+        for r in rolls:
+            key = outcome(r + int(b))
+            odds.setdefault(key, np.zeros(len(kinds)))[i] += 1 / len(rolls)
+    return {key: p[inverse] for key, p in odds.items()}
+
+class GameMDP:
+    def __init__(self, base_luck=0, base_damage=1, max_health=10, hp_points=5,
+                 hunger_points=4, money=(0, 5, 10, 20, 40, 80), resource_points=4,
+                 gear_tiers=3):
+        self.base_luck = base_luck
+        self.base_damage = base_damage
+        self.ladder = gear_ladder(gear_tiers)
+        self.axes = [
+            Axis("location", range(len(main.LOCATIONS))),
+            Axis("health", grid(max_health, hp_points, bottom=1)),
+            Axis("hunger", grid(10, hunger_points)),
+            Axis("money", money),
+            Axis("wood", grid(main.BOAT_RECIPE[1], resource_points)),
+            Axis("stone", grid(main.BOAT_RECIPE[2], resource_points)),
+            Axis("machineparts", grid(main.BOAT_RECIPE[3], resource_points)),
+            Axis("gear", range(len(self.ladder))),
+            Axis("boat", (0, 1)),
+        ]
+        self.shape = tuple(len(a) for a in self.axes)
+        self.n = int(np.prod(self.shape))
+        self.dead, self.escaped = self.n, self.n + 1
+        idx = np.indices(self.shape).reshape(len(self.shape), -1)
+        self.index = {a.name: i for a, i in zip(self.axes, idx)}
+        self.value = {a.name: a.points[i] for a, i in zip(self.axes, idx)}
+        gear = self.index["gear"]
+        self.luck = base_luck + np.array([g[1] for g in self.ladder])[gear]
+        self.damage = base_damage + np.array([g[0] for g in self.ladder])[gear]
+        self.location = np.array(main.LOCATIONS)[self.index["location"]]
+
+    # ---------- building transitions ----------
+    def _entries(self, rows, prob, changes, dead=None):
+        """COO entries for moving `rows` to the states described by `changes`.
+
+        `changes` maps axis name to raw values, every other axis stays put.
+        Rows flagged in `dead` go to the dead state instead.
+        """
+        cols = [(np.zeros(len(rows), dtype=np.int64), prob)]
+        for axis, stride in zip(self.axes, self._strides()):
+            if axis.name in changes:
+                lo, hi, w = axis.spread(changes[axis.name])
+                old = self.index[axis.name][rows]
+                cols = [(c + (i - old) * stride, p * wt) for c, p in cols
+                        for i, wt in ((lo, 1 - w), (hi, w))]
+        out_rows, out_cols, out_p = [], [], []
+        for c, p in cols:
+            target = rows + c
+            if dead is not None:
+                target = np.where(dead, self.dead, target)
+            out_rows.append(rows)
+            out_cols.append(target)
+            out_p.append(p)
+        return np.concatenate(out_rows), np.concatenate(out_cols), np.concatenate(out_p)
+
+    def _strides(self):
+        return [int(np.prod(self.shape[i + 1:])) for i in range(len(self.shape))]
+
+    def _matrix(self, parts, terminal_rows=True):
+        rows, cols, probs = (np.concatenate(x) for x in zip(*parts)) if parts else ([], [], [])
+        if terminal_rows:
+            rows = np.concatenate([rows, [self.dead, self.escaped]])
+            cols = np.concatenate([cols, [self.dead, self.escaped]])
+            probs = np.concatenate([probs, [1.0, 1.0]])
+        keep = probs > 0
+        size = self.n + 2
+        return sparse.csr_matrix((probs[keep], (rows[keep], cols[keep])), shape=(size, size))
+
+    def _hungry(self, rows, prob, changes, hunger_cost=1):
+        """Entries for an action that costs hunger, starving if it runs out."""
+        hunger = self.value["hunger"][rows] + changes.pop("hunger_gain", 0) - hunger_cost
+        health = changes.pop("health", self.value["health"][rows])
+        starving = hunger < 0
+        changes["hunger"] = np.minimum(np.maximum(hunger, 0), 10)
+        changes["health"] = np.minimum(health - starving, self.axes[1].points[-1])
+        return self._entries(rows, prob, changes, dead=changes["health"] <= 0)
+
+    def encounter_matrix(self):
+        """Turn start: a zombie may find you, and combat changes health and money."""
+        parts = []
+        rows = np.arange(self.n)
+        chance = np.array([main.encounter_chance(loc) for loc in self.location])
+        parts.append(self._entries(rows, 1 - chance, {}))
+        risky = np.flatnonzero(chance)
+        fights = np.stack([self.damage[risky], self.value["health"][risky]]).astype(int)
+        groups, inverse = np.unique(fights, axis=1, return_inverse=True)
+        for enemy in main.ENEMIES:
+            reward = (enemy.reward_min + enemy.reward_max) / 2
+            for g, (damage, hp) in enumerate(groups.T):
+                members = risky[inverse.ravel() == g]
+                p = chance[members] / len(main.ENEMIES)
+                for (result, hp_left), q in main.combat_odds(enemy, int(damage), 0, int(hp)).items():
+                    changes = {"health": np.full(len(members), hp_left)}
+                    if result == "won":
+                        changes["money"] = self.value["money"][members] + reward
+                    parts.append(self._entries(members, p * q, changes,
+                                               dead=np.full(len(members), result == "dead")))
+        return self._matrix(parts)
+
+    def actions(self):
+        """Yields (name, valid rows, transition matrix before the next turn starts)."""
+        loc, v = self.location, self.value
+        everywhere = np.arange(self.n)
+
+        # Forage
+        rows = everywhere[(loc == "Forest") | (loc == "Lake")]
+        parts = []
+        chances = roll_odds(range(-10, 33), (self.luck[rows] * 1.8).astype(int), main.forage_outcome)
+        for kind, p in chances.items():
+            if kind == "poison":
+                for loss in (1, 2, 3):
+                    parts.append(self._hungry(rows, p / 3, {"health": v["health"][rows] - loss}))
+            else:
+                gain = main.FORAGE_FOOD[kind][0] if kind in main.FORAGE_FOOD else 0
+                parts.append(self._hungry(rows, p, {"hunger_gain": gain}))
+        plant = everywhere[loc == "Nuclear Plant"]
+        parts.append(self._hungry(plant, np.full(len(plant), 10 / 11), {}))
+        parts.append(self._hungry(plant, np.full(len(plant), 1 / 11), {"money": v["money"][plant] + 10}))
+        yield "forage", np.concatenate([rows, plant]), self._matrix(parts, False)
+
+        # Fishing, with the catch sold straight away
+        rows = everywhere[loc == "Lake"]
+        parts = []
+        chances = roll_odds(range(101), (self.luck[rows] * 2.5).astype(int), main.fish_category)
+        for category, p in chances.items():
+            cash = main.SELL_VALUES[category] if category else 0
+            parts.append(self._hungry(rows, p, {"money": v["money"][rows] + cash}))
+        yield "fish", rows, self._matrix(parts, False)
+
+        # Gathering boat resources
+        parts, valid = [], []
+        for place, resource in main.GATHER_AT.items():
+            rows = everywhere[loc == place]
+            valid.append(rows)
+            for amount in range(6):
+                parts.append(self._hungry(rows, np.full(len(rows), 1 / 6),
+                                          {resource: v[resource][rows] + amount}))
+        yield "gather", np.concatenate(valid), self._matrix(parts, False)
+
+        # Travel
+        for i, place in enumerate(main.LOCATIONS):
+            rows = everywhere[loc != place]
+            parts = [self._entries(rows, np.ones(len(rows)), {"location": np.full(len(rows), i)})]
+            yield f"go {place}", rows, self._matrix(parts, False)
+
+        # Shack purchases and rest
+        shack = loc == "Shack"
+        rows = everywhere[shack]
+        yield "rest", rows, self._matrix([self._entries(rows, np.ones(len(rows)), {})], False)
+
+        gear = self.index["gear"]
+        next_cost = np.array([c for _, _, c in self.ladder[1:]] + [np.inf])[gear]
+        rows = everywhere[shack & (v["money"] >= next_cost)]
+        parts = [self._entries(rows, np.ones(len(rows)), {
+            "gear": gear[rows] + 1.0, "money": v["money"][rows] - next_cost[rows]})]
+        yield "upgrade gear", rows, self._matrix(parts, False)
+
+        for name, value, cost, _ in main.FOOD:
+            if not isinstance(value, int):
+                continue
+            rows = everywhere[shack & (v["money"] >= cost)]
+            parts = [self._entries(rows, np.ones(len(rows)), {
+                "hunger": np.minimum(v["hunger"][rows] + value, 10), "money": v["money"][rows] - cost})]
+            yield f"eat {name}", rows, self._matrix(parts, False)
+
+        name, _, heal, cost, _ = next(a for a in main.ARMOR if a[1] == "heal")
+        rows = everywhere[shack & (v["money"] >= cost)]
+        parts = [self._entries(rows, np.ones(len(rows)), {
+            "health": v["health"][rows] + heal, "money": v["money"][rows] - cost})]
+        yield f"buy {name}", rows, self._matrix(parts, False)
+
+        enough = shack & (v["boat"] == 0)
+        for resource, need in zip(RESOURCES, main.BOAT_RECIPE[1:4]):
+            enough &= v[resource] >= need
+        rows = everywhere[enough]
+        changes = {r: v[r][rows] - need for r, need in zip(RESOURCES, main.BOAT_RECIPE[1:4])}
+        changes["boat"] = np.ones(len(rows))
+        yield "craft boat", rows, self._matrix([self._entries(rows, np.ones(len(rows)), changes)], False)
+
+    # ---------- solving ----------
+    def solve(self, discount=0.999, tol=1e-7, max_iter=5000, sweeps=30):
+        """Modified policy iteration: a full backup over every action picks a
+        policy, then a few cheap sweeps evaluate just that policy."""
+        encounter = self.encounter_matrix()
+        names, masks, blocks = [], [], []
+        for name, rows, matrix in self.actions():
+            names.append(name)
+            mask = np.zeros(self.n, dtype=bool)
+            mask[rows] = True
+            masks.append(mask)
+            blocks.append(matrix[:self.n])
+        stacked = sparse.vstack(blocks).tocsr()
+        penalty = np.where(masks, 0.0, -np.inf)
+        sail = (self.location == "Lake") & (self.value["boat"] == 1)
+        states = np.arange(self.n)
+
+        values = np.zeros(self.n + 2)
+        values[self.escaped] = 1.0
+        for iteration in range(1, max_iter + 1):
+            q = discount * (stacked @ (encounter @ values)).reshape(len(names), self.n) + penalty
+            choice = q.argmax(axis=0)
+            best = np.where(sail, 1.0, q[choice, states])
+            change = np.abs(best - values[:self.n]).max()
+            values[:self.n] = best
+            if change < tol:
+                break
+            chosen = stacked[choice * self.n + states]
+            for _ in range(sweeps):
+                values[:self.n] = np.where(sail, 1.0, discount * (chosen @ (encounter @ values)))
+        policy = np.array(names + ["sail"], dtype=object)[np.where(sail, len(names), choice)]
+        return Solution(self, values[:self.n], policy, iteration)
+
+class Solution:
+    def __init__(self, mdp, values, policy, iterations):
+        self.mdp = mdp
+        self.values = values
+        self.policy = policy
+        self.iterations = iterations
+
+    def _state(self, player: main.Player):
+        gear = max(i for i, (mod, luck, _) in enumerate(self.mdp.ladder)
+                   if mod <= player.weapon_mod and luck <= player.rod_luck)
+        raw = {
+            "location": main.LOCATIONS.index(player.location),
+            "health": player.health, "hunger": max(player.hunger, 0),
+            "money": player.money, "wood": player.wood, "stone": player.stone,
+            "machineparts": player.machineparts, "gear": gear, "boat": int(player.hasboat),
+        }
+        # Nearest grid point on every axis
+        return np.ravel_multi_index(
+            [int(np.abs(a.points - raw[a.name]).argmin()) for a in self.mdp.axes], self.mdp.shape)
+
+    def value(self, player):
+        """Discounted chance of escaping from this player's position under optimal play."""
+        return float(self.values[self._state(player)])
+
+    def action(self, player):
+        return self.policy[self._state(player)]
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--luck", type=int, default=0, help="base luck from character creation")
+    parser.add_argument("--damage", type=int, default=1)
+    parser.add_argument("--max-health", type=int, default=10)
+    parser.add_argument("--hp", type=int, default=5, help="health grid points")
+    parser.add_argument("--hunger", type=int, default=4, help="hunger grid points")
+    parser.add_argument("--money", default="0,5,10,20,40,80", help="money grid points")
+    parser.add_argument("--resources", type=int, default=4, help="grid points per boat resource")
+    parser.add_argument("--gear", type=int, default=3, help="gear tiers including none")
+    parser.add_argument("--discount", type=float, default=0.999)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    mdp = GameMDP(args.luck, args.damage, args.max_health, args.hp, args.hunger,
+                  [float(m) for m in args.money.split(",")], args.resources, args.gear)
+    solution = mdp.solve(args.discount)
+    elapsed = time.perf_counter() - start
+    print(f"{mdp.n:,} states solved in {elapsed:.1f}s ({solution.iterations} iterations)")
+
+    player = main.Player()
+    player.base_luck, player.base_damage = args.luck, args.damage
+    player.max_health = player.health = args.max_health
+    for location in main.LOCATIONS:
+        player.location = location
+        print(f"  start at {location:<14} escape value {solution.value(player):.3f}, "
+              f"first move: {solution.action(player)}")
+
+if __name__ == "__main__":
+    main_cli()
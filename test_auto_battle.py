@@ -0,0 +1,14 @@
+import pytest
+
+import combat_check
+
+FIGHTS = 1000  # per case and path; combat_check.py runs the full-size sample
+CASES = combat_check.cases()
+CUTOFF = 0.01 / (len(combat_check.CHECKS) * len(CASES))  # Bonferroni over the module
+
+@pytest.mark.parametrize("enemy,setup,tactic", CASES,
+                         ids=[f"{e.name}-{setup}-{tactic}" for e, setup, tactic in CASES])
+def test_auto_battle_matches_playing_by_hand(enemy, setup, tactic):
+    ps = combat_check.check_case(enemy, setup, tactic, FIGHTS)
+    failed = {name: p for name, p in zip(combat_check.CHECKS, ps) if p < CUTOFF}
+    assert not failed, failed
@@ -0,0 +1,31 @@
+import threading
+import time
+
+import pytest
+
+import main
+from sim import headless
+
+def test_typed_line_ends_a_pause_at_once():
+    terminal = main.TerminalInput()
+    terminal._thread = threading.current_thread()  # keys come from _feed, not stdin
+    typist = threading.Timer(0.05, lambda: [terminal._feed(ch) for ch in "4\n"])
+    typist.start()
+    start = time.perf_counter()
+    assert terminal.wait_skip(5)
+    assert time.perf_counter() - start < 1
+    assert terminal.read_line() == "4"
+
+def test_scripted_input_retries_invalid_entries():
+    previous = main.set_input(main.ScriptedInput(["x", " 2 "]))
+    try:
+        with headless():
+            assert main.choose("Pick one", {"1": "One", "2": "Two"}) == "2"
+    finally:
+        main.set_input(previous)
+
+def test_scripted_input_runs_out_with_eof():
+    source = main.ScriptedInput(["1"])
+    assert source.read_line() == "1"
+    with pytest.raises(EOFError):
+        source.read_line()
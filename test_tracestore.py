@@ -0,0 +1,59 @@
+import random
+
+import pytest
+
+from tracestore import TraceReader, TraceWriter, label_capacity
+
+FIELDS = [("turn", "I", False), ("health", "h", False), ("money", "d", False),
+          ("action", "B", True)]
+
+def test_round_trip_over_several_chunks(tmp_path):
+    rng = random.Random(7)
+    actions = ["fish", "hunt", "sleep", "craft"]
+    rows = [(turn, rng.randint(-5, 20), round(rng.uniform(0, 500), 2), rng.choice(actions))
+            for turn in range(2500)]
+    path = tmp_path / "games.zpt"
+    with TraceWriter(path, FIELDS, chunk_rows=1000) as trace:
+        for row in rows:
+            trace.append(*row)
+
+    with TraceReader(path) as trace:
+        assert len(trace) == len(rows)
+        assert trace.columns == [name for name, _, _ in FIELDS]
+        assert [len(chunk) for chunk in trace.scan("turn")] == [1000, 1000, 500]
+        for position, name in enumerate(trace.columns[:3]):
+            assert list(trace.column(name)) == [row[position] for row in rows]
+        assert [trace.label("action", code) for code in trace.column("action")] == \
+            [row[3] for row in rows]
+
+@pytest.mark.parametrize("row", [(1, 2, 3.0), (1, 2, 3.0, "fish", "extra")])
+def test_rejects_rows_of_the_wrong_length(tmp_path, row):
+    with TraceWriter(tmp_path / "games.zpt", FIELDS) as trace:
+        with pytest.raises(ValueError, match="expected 4"):
+            trace.append(*row)
+        assert trace.labels["action"] == {}
+
+def test_rejects_more_labels_than_the_typecode_holds(tmp_path):
+    with TraceWriter(tmp_path / "games.zpt", FIELDS) as trace:
+        for i in range(label_capacity("B")):
+            trace.append(i, 0, 0.0, f"label {i}")
+        trace.append(0, 0, 0.0, "label 0")
+        with pytest.raises(ValueError, match="256 labels"):
+            trace.append(0, 0, 0.0, "one too many")
+    with TraceReader(tmp_path / "games.zpt") as trace:
+        assert len(trace) == 257
+
+@pytest.mark.parametrize("row", [(2, 10 ** 6, 1.0, "hunt"), (2, 3, "lots", "hunt"), (-1, 3, 1.0, "hunt")])
+def test_rejects_values_that_dont_fit_and_keeps_columns_aligned(tmp_path, row):
+    path = tmp_path / "games.zpt"
+    with TraceWriter(path, FIELDS) as trace:
+        trace.append(1, 5, 1.0, "fish")
+        with pytest.raises(ValueError, match="can't hold"):
+            trace.append(*row)
+        assert trace.labels["action"] == {"fish": 0}
+        trace.append(3, 7, 2.0, "sleep")
+    with TraceReader(path) as trace:
+        assert len(trace) == 2
+        assert list(trace.column("turn")) == [1, 3]
+        assert list(trace.column("health")) == [5, 7]
+        assert [trace.label("action", code) for code in trace.column("action")] == ["fish", "sleep"]
@@ -0,0 +1,233 @@
+"""Chunked columnar storage for per-turn traces of simulated games.
+
+A trace file is a run of chunks followed by an index:
+
+    b"ZPFTRACE" | chunk | chunk | ... | index | meta | footer
+
+Every chunk holds up to `chunk_rows` rows stored column by column, one typed
+array per field, each compressed on its own with zlib. The index records
+where every column of every chunk starts and how long it is, so a reader can
+memory-map the file and decompress just the column it wants. String columns
+(actions, locations, outcomes) are stored as small integer codes plus a
+label list in the meta block.
+
+    with TraceWriter("games.zpt", sim.TRACE_FIELDS) as trace:
+        sim.run_game(seed, trace=trace)
+
+    python tracestore.py traces/*.zpt --column health
+"""
+import argparse
+import json
+import mmap
+import struct
+import sys
+import zlib
+from array import array
+from collections import Counter
+
+MAGIC = b"ZPFTRACE"
+VERSION = 1
+FOOTER = struct.Struct("<QQ8s")  # index bytes, meta bytes, magic
+
+class TraceFormatError(ValueError):
+    pass
+
+def label_capacity(typecode):
+    """How many distinct labels a column of this integer typecode can number."""
+    bits = 8 * array(typecode).itemsize
+    return 2 ** bits if typecode.isupper() else 2 ** (bits - 1)
+
+class TraceWriter:
+    """Appends rows to a trace file, one compressed chunk at a time.
+
+    `fields` is a list of (name, array typecode, labelled). Labelled columns
+    take strings and store them as codes into a label list that grows as new
+    strings turn up.
+    """
+
+    def __init__(self, path, fields, chunk_rows=65536, level=6):
+        self.fields = [(name, code, bool(labelled)) for name, code, labelled in fields]
+        self.names = [name for name, _, _ in self.fields]
+        self.chunk_rows = chunk_rows
+        self.level = level
+        self.labels = {name: {} for name, _, labelled in self.fields if labelled}
+        self.index = array("Q")
+        self.rows = 0
+        self._file = open(path, "wb")
+        self._file.write(MAGIC)
+        self._reset()
+
+    def _reset(self):
+        self._columns = [array(code) for _, code, _ in self.fields]
+
+    def append(self, *row):
+        """Adds one row, values in `fields` order. A row that doesn't fit
+        raises ValueError and leaves the trace as it was."""
+        if len(row) != len(self.fields):
+            raise ValueError(f"row has {len(row)} values, expected {len(self.fields)}")
+        cells, new_labels = [], []
+        for (name, code, labelled), value in zip(self.fields, row):
+            if labelled:
+                codes = self.labels[name]
+                if value not in codes:
+                    if len(codes) >= label_capacity(code):
+                        raise ValueError(f"column {name!r} already has {len(codes)} labels, "
+                                         f"the most typecode {code!r} can hold")
+                    new_labels.append((codes, value))
+                value = codes.get(value, len(codes))
+            try:
+                cells.append(array(code, [value]))
+            except (OverflowError, TypeError) as exc:
+                raise ValueError(f"column {name!r} can't hold {value!r}: {exc}") from None
+        for codes, label in new_labels:
+            codes[label] = len(codes)
+        for column, cell in zip(self._columns, cells):
+            column.extend(cell)
+        if len(self._columns[0]) >= self.chunk_rows:
+            self.flush()
+
+    def flush(self):
+        rows = len(self._columns[0])
+        if not rows:
+            return
+        self.index.append(rows)
+        for column in self._columns:
+            blob = zlib.compress(column.tobytes(), self.level)
+            self.index.extend((self._file.tell(), len(blob)))
+            self._file.write(blob)
+        self.rows += rows
+        self._reset()
+
+    def close(self):
+        if self._file.closed:
+            return
+        self.flush()
+        index = self.index
+        if sys.byteorder != "little":
+            index = array("Q", index)
+            index.byteswap()
+        meta = json.dumps({
+            "version": VERSION,
+            "byteorder": sys.byteorder,
+            "rows": self.rows,
+            "fields": [[name, code, array(code).itemsize, labelled]
+                       for name, code, labelled in self.fields],
+            "labels": {name: list(codes) for name, codes in self.labels.items()},
+        }).encode()
+        self._file.write(index.tobytes())
+        self._file.write(meta)
+        self._file.write(FOOTER.pack(len(index) * index.itemsize, len(meta), MAGIC))
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+class TraceReader:
+    """Memory-mapped view of a trace file. Only touched columns are decompressed."""
+
+    def __init__(self, path):
+        self._file = open(path, "rb")
+        self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        size = len(self._map)
+        if size < len(MAGIC) + FOOTER.size or self._map[:len(MAGIC)] != MAGIC:
+            raise TraceFormatError(f"{path} is not a trace file")
+        index_size, meta_size, magic = FOOTER.unpack_from(self._map, size - FOOTER.size)
+        if magic != MAGIC:
+            raise TraceFormatError(f"{path} was not closed properly")
+        meta_at = size - FOOTER.size - meta_size
+        meta = json.loads(self._map[meta_at:meta_at + meta_size])
+        if meta["version"] != VERSION:
+            raise TraceFormatError(f"{path} is version {meta['version']}, expected {VERSION}")
+        self.rows = meta["rows"]
+        self.labels = meta["labels"]
+        self._swap = meta["byteorder"] != sys.byteorder
+        self.fields = {}
+        for position, (name, code, itemsize, labelled) in enumerate(meta["fields"]):
+            if array(code).itemsize != itemsize:
+                raise TraceFormatError(f"column {name!r} was written with {itemsize}-byte items")
+            self.fields[name] = (position, code)
+        index = array("Q")
+        index.frombytes(self._map[meta_at - index_size:meta_at])
+        if sys.byteorder != "little":
+            index.byteswap()
+        stride = 1 + 2 * len(self.fields)
+        self._chunks = [index[i:i + stride] for i in range(0, len(index), stride)]
+
+    @property
+    def columns(self):
+        return list(self.fields)
+
+    def __len__(self):
+        return self.rows
+
+    def scan(self, name):
+        """Yields the column `name` one chunk at a time as typed arrays."""
+        position, code = self.fields[name]
+        for chunk in self._chunks:
+            offset, length = chunk[1 + 2 * position], chunk[2 + 2 * position]
+            values = array(code)
+            values.frombytes(zlib.decompress(self._map[offset:offset + length]))
+            if self._swap:
+                values.byteswap()
+            yield values
+
+    def column(self, name):
+        """The whole column as one array. Fine for small files, use scan() for big ones."""
+        values = array(self.fields[name][1])
+        for chunk in self.scan(name):
+            values.extend(chunk)
+        return values
+
+    def label(self, name, code):
+        return self.labels[name][code]
+
+    def close(self):
+        self._map.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+def summarize(paths, name):
+    """Count, min, max and mean of a numeric column, or label counts, over many files."""
+    count, total, low, high = 0, 0.0, None, None
+    labels = Counter()
+    for path in paths:
+        with TraceReader(path) as trace:
+            labelled = name in trace.labels
+            for chunk in trace.scan(name):
+                if labelled:
+                    labels.update(trace.label(name, code) for code in chunk)
+                    continue
+                count += len(chunk)
+                total += sum(chunk)
+                if chunk:
+                    low = min(chunk) if low is None else min(low, min(chunk))
+                    high = max(chunk) if high is None else max(high, max(chunk))
+    if labels:
+        return labels
+    return {"rows": count, "min": low, "max": high, "mean": total / count if count else None}
+
+def main_cli():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("paths", nargs="+")
+    parser.add_argument("--column", help="column to summarize, lists columns if left out")
+    args = parser.parse_args()
+
+    if not args.column:
+        for path in args.paths:
+            with TraceReader(path) as trace:
+                print(f"{path}: {len(trace):,} rows, columns {', '.join(trace.columns)}")
+        return
+    result = summarize(args.paths, args.column)
+    for key, value in (result.most_common() if isinstance(result, Counter) else result.items()):
+        print(f"{key:>16}  {value}")
+
+if __name__ == "__main__":
+    main_cli()